@@ -0,0 +1 @@
+"""Shared infrastructure for the Advent of Code 2022 solutions."""
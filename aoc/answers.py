@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Extract the answers recorded in the trailing comments of each solution.
+
+Every solution ends with comments like:
+
+    # Part one solution for test-input1 is: 24000
+    # Part two solution for input is: 196804
+
+Multi-line answers (the day 10 screen) follow on the next comment lines, and those lines
+are the answer rather than the letters written after "is:".
+"""
+
+import re
+
+from aoc import days
+
+# The comment line that records an answer.
+ANSWER_RE = re.compile(r'# Part (one|two) solution for (\S+) is:(.*)$')
+# The comment line that marks the end of the recorded answers.
+END_MARKER = '# Local Variables:'
+
+# ----------------------------------------------------------------------------------------
+def recorded(day):
+    "Return a dictionary of the recorded answers for a day, keyed by (part, input name)."
+    answers = {}
+    current = None
+    with open(days.solution_path(day)) as fh:
+        for line in fh:
+            line = line.rstrip()
+            match = ANSWER_RE.match(line)
+            if match:
+                part = 1 if match.group(1) == 'one' else 2
+                current = (part, match.group(2))
+                answers[current] = [match.group(3).strip()]
+            elif current is not None and line.startswith('# ') and line != END_MARKER:
+                answers[current].append(line[2:])
+            else:
+                current = None
+    # Continuation lines replace the summary on the "is:" line.
+    return {key: '\n'.join(value[1:] if len(value) > 1 else value)
+            for (key, value) in answers.items()}
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
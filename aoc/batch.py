@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Solve one day's challenge for many input files in parallel.
+
+Used by the --batch option of every solution:
+
+    python3 day01/solution.py --part=both --batch=inputs/ > answers.ndjson
+
+The inputs are spread over a process pool, and each result is written as a line of JSON
+(file, part, answer, seconds) as soon as it's solved.  An input that can't be read or
+solved reports its error in its own line without stopping the rest of the batch.
+"""
+
+import json
+import multiprocessing
+import os
+from functools import partial
+
+from aoc import inputs, instrument
+
+# ----------------------------------------------------------------------------------------
+def batch_paths(path):
+    """
+    Return the input files named by path.
+
+    If path is a directory, that's every file in it.  Otherwise path is a file listing
+    one input file per line, relative to the listing.
+    """
+    if os.path.isdir(path):
+        names = sorted(os.listdir(path))
+        return [os.path.join(path, name) for name in names
+                if os.path.isfile(os.path.join(path, name))]
+    with open(path) as fh:
+        listed = [line.strip() for line in fh if line.strip()]
+    return [os.path.join(os.path.dirname(path), name) for name in listed]
+
+# ----------------------------------------------------------------------------------------
+def solve_file(solve, part, path, memory=False):
+    "Solve part of the challenge for the input file at path, and return a result."
+    result = {"file": path, "part": part, "answer": None, "seconds": None,
+              "error": None}
+    try:
+        data = inputs.read(path)
+        (answer, record) = instrument.measure(solve, part, data, path, memory)
+    except Exception as e:
+        result["error"] = "%s: %s" % (type(e).__name__, e)
+        return result
+    result["answer"] = answer
+    result["seconds"] = record["total"]
+    result["phases"] = record["phases"]
+    result["ops"] = record["ops"]
+    if "engine" in record:
+        result["engine"] = record["engine"]
+    if memory:
+        result["peak_memory"] = record["peak_memory"]
+    return result
+
+# ----------------------------------------------------------------------------------------
+def run_batch(solve, part, paths, processes=None, memory=False):
+    "Solve each input file on a pool of processes, yielding each result once it's ready."
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(partial(solve_file, solve, part, memory=memory),
+                                          paths, chunksize=1):
+            yield result
+
+# ----------------------------------------------------------------------------------------
+def write_results(fh, results):
+    "Write each result to fh as a line of JSON as it arrives, and return the error count."
+    errors = 0
+    for result in results:
+        if result["error"] is not None:
+            errors += 1
+        fh.write(json.dumps(result, default=str) + '\n')
+        fh.flush()
+    return errors
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark the solutions against the answers recorded in their trailing comments.
+
+Each recorded (day, part, input) is solved several times in this process.  The answer is
+checked, and the minimum and median wall times are compared against a saved baseline.
+
+Usage: python3 -m aoc.bench [--repeat=N] [--day=N ...] [--input=NAME] [--save]
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from optparse import OptionParser
+
+from aoc import answers, days, inputs
+
+# The default location of the saved baseline timings.
+BASELINE = os.path.join(days.ROOT, 'bench-baseline.json')
+
+# ----------------------------------------------------------------------------------------
+def find_cases(day_list, parts, input_names=None):
+    "Return a (day, part, input name, expected answer) case for each recorded answer."
+    cases = []
+    for day in day_list:
+        for ((part, input_name), expected) in sorted(answers.recorded(day).items()):
+            if part not in parts:
+                continue
+            if input_names and input_name not in input_names:
+                continue
+            if not os.path.isfile(days.input_path(day, input_name)):
+                continue
+            cases.append((day, part, input_name, expected))
+    return cases
+
+# ----------------------------------------------------------------------------------------
+def case_key(day, part, input_name):
+    "Return the key for a case in the baseline file."
+    return "day%02d/part%d/%s" % (day, part, input_name)
+
+# ----------------------------------------------------------------------------------------
+def benchmark(day, part, input_name, expected, repeat):
+    "Solve a case repeat times, and return a result dictionary."
+    module = days.load(day)
+    data = inputs.read(days.input_path(day, input_name))
+    times = []
+    answer = None
+    for n in range(repeat):
+        start = time.perf_counter()
+        answer = module.solve(part, data)
+        times.append(time.perf_counter() - start)
+    return {"day": day, "part": part, "input": input_name,
+            "answer": str(answer), "correct": str(answer) == expected,
+            "min": min(times), "median": statistics.median(times)}
+
+# ----------------------------------------------------------------------------------------
+def load_baseline(path):
+    "Return the saved baseline, or an empty baseline if there isn't one."
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+def save_baseline(path, baseline, results):
+    "Merge the results into the baseline and save it."
+    for result in results:
+        key = case_key(result["day"], result["part"], result["input"])
+        baseline[key] = {"min": result["min"], "median": result["median"]}
+    with open(path, 'w') as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+# ----------------------------------------------------------------------------------------
+def compare(result, baseline, threshold):
+    """
+    Return the status of a result and its change in median time from the baseline.
+
+    The status is WRONG if the answer doesn't match, SLOWER if the median time grew by
+    more than threshold (a fraction, e.g. 0.2 for 20%), and otherwise ok.
+    """
+    saved = baseline.get(case_key(result["day"], result["part"], result["input"]))
+    change = None
+    if saved is not None and saved["median"] > 0:
+        change = result["median"] / saved["median"] - 1
+    if not result["correct"]:
+        return ("WRONG", change)
+    if change is not None and change > threshold:
+        return ("SLOWER", change)
+    return ("ok", change)
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return the command line parser for the benchmark."
+    parser = OptionParser(usage="python3 -m aoc.bench [options]")
+    parser.add_option("-r", "--repeat", action="store", type="int", default=5,
+                      help="Number of times to solve each case (default: 5).")
+    parser.add_option("-D", "--day", action="append", type="int", default=[],
+                      help="Benchmark only this day (may be repeated).")
+    parser.add_option("-p", "--part", action="store", type="int",
+                      help="Benchmark only this part.")
+    parser.add_option("-i", "--input", action="append", default=[],
+                      help="Benchmark only this input name (may be repeated).")
+    parser.add_option("-b", "--baseline", action="store", default=BASELINE,
+                      help="Baseline file (default: bench-baseline.json).")
+    parser.add_option("-t", "--threshold", action="store", type="float", default=0.2,
+                      help="Flag cases whose median slowed by more than this fraction.")
+    parser.add_option("-s", "--save", action="store_true",
+                      help="Save the results as the new baseline.")
+    return parser
+
+def main():
+    parser = make_parser()
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+
+    if options.part not in [None, 1, 2]:
+        parser.error("please specify --part=1 or --part=2")
+
+    if options.repeat < 1:
+        parser.error("--repeat must be at least one")
+
+    day_list = options.day or days.find_days()
+    parts = [options.part] if options.part else [1, 2]
+    baseline = load_baseline(options.baseline)
+
+    print("Day Part Input            Min(s)   Median(s)   Change  Status")
+    results = []
+    failed = False
+    for (day, part, input_name, expected) in find_cases(day_list, parts, options.input):
+        result = benchmark(day, part, input_name, expected, options.repeat)
+        results.append(result)
+        (status, change) = compare(result, baseline, options.threshold)
+        change_str = "-" if change is None else "%+.1f%%" % (change * 100)
+        print("%3d %4d %-12s %10.6f %11.6f %8s  %s" % (
+            day, part, input_name, result["min"], result["median"], change_str, status))
+        if status != "ok":
+            failed = True
+
+    if options.save:
+        save_baseline(options.baseline, baseline, results)
+        print("Saved baseline to %s" % options.baseline)
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
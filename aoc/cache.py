@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+An on-disk cache of answers, addressed by the content of the input and the solution.
+
+The key of an entry is a hash of the day, the part, the input bytes, and the source of the
+day's solution.py and of every module in the aoc package (which parse the input and run
+the shared algorithms), so editing a solution or the package invalidates every answer
+that might have changed.  Each entry
+is a small JSON file in CACHE_DIR named by its key.  Reading an entry updates its
+modification time, and when the entries grow beyond max_bytes the least recently used
+ones are removed.
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+from aoc import days
+
+# Where the cache entries are stored.
+CACHE_DIR = os.path.join(days.ROOT, '.aoc-cache')
+# How many bytes of entries to keep before evicting the least recently used.
+MAX_BYTES = 4 * 2**20
+# The fields of a result that are saved in the cache.
+FIELDS = ("answer", "seconds", "phases", "total", "input_bytes")
+
+# ----------------------------------------------------------------------------------------
+def source_paths(day):
+    "Return the paths of the solution for a day and of the modules of the aoc package."
+    package = sorted(glob.glob(os.path.join(os.path.dirname(__file__), '*.py')))
+    return [days.solution_path(day)] + package
+
+def source_hash(day):
+    "Return the hash of the source of the solution for a day and the package it uses."
+    digest = hashlib.sha256()
+    for path in source_paths(day):
+        with open(path, 'rb') as fh:
+            source = fh.read()
+        # Include the name and length of each file, so that no two sets of files collide.
+        digest.update(("%s:%d:" % (os.path.basename(path), len(source))).encode())
+        digest.update(source)
+    return digest.hexdigest()
+
+# ----------------------------------------------------------------------------------------
+def make_key(day, part, data, solution_hash):
+    "Return the cache key for solving part of a day for the input data."
+    digest = hashlib.sha256(("day%02d/part%s/%s/" % (day, part, solution_hash)).encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+# ----------------------------------------------------------------------------------------
+class AnswerCache(object):
+    "A directory of answers with least recently used eviction."
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        "Return the path of the entry for key."
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        "Return the saved result for key, or None if there isn't one."
+        path = self.path(key)
+        try:
+            with open(path) as fh:
+                entry = json.load(fh)
+            # Mark the entry as recently used.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        # JSON has no tuples, but the answers to both parts are returned as one.
+        if isinstance(entry["answer"], list):
+            entry["answer"] = tuple(entry["answer"])
+        return entry
+
+    def put(self, key, result):
+        "Save the answer and timings of a result under key, and evict old entries."
+        entry = {field: result.get(field) for field in FIELDS}
+        os.makedirs(self.directory, exist_ok=True)
+        # Write a temporary file and rename it, so readers never see a partial entry.
+        temporary = "%s.%d.tmp" % (self.path(key), os.getpid())
+        with open(temporary, 'w') as fh:
+            json.dump(entry, fh, default=str)
+        os.replace(temporary, self.path(key))
+        self.evict()
+
+    def evict(self):
+        "Remove the least recently used entries until the cache fits in max_bytes."
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for (mtime, size, name) in entries)
+        for (mtime, size, name) in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
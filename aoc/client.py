@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Solve a day's challenge input with the warm solver daemon (see aoc.daemon).
+
+This replaces "python3 dayNN/solution.py --part=N < input" in pipelines, printing the
+same answer without importing the solution.  The client imports as little as possible,
+since its startup is most of the time spent on a request:
+
+    python3 -m aoc.client --day=N --part=N < input
+    python3 -m aoc.client --day=N --part=both --input=dayNN/input
+"""
+
+import json
+import os
+import socket
+import sys
+from optparse import OptionParser
+
+# Where the daemon listens by default.
+SOCKET_PATH = os.path.join(os.environ.get("TMPDIR", "/tmp"),
+                           "aoc-daemon-%d.sock" % os.getuid())
+
+# ----------------------------------------------------------------------------------------
+def send_request(path, day, part, data=None, input_path=None):
+    """
+    Ask the daemon listening at path to solve part of a day, and return its reply.
+
+    The input is either the bytes in data, or the file at input_path read by the daemon.
+    """
+    request = {"day": day, "part": part}
+    if input_path is not None:
+        request["path"] = os.path.abspath(input_path)
+    else:
+        request["size"] = len(data)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        if input_path is None:
+            sock.sendall(data)
+        with sock.makefile('rb') as fh:
+            reply = json.loads(fh.readline())
+    # JSON has no tuples, but the answers to both parts are returned as one.
+    if isinstance(reply.get("answer"), list):
+        reply["answer"] = tuple(reply["answer"])
+    return reply
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return the command line parser for the client."
+    parser = OptionParser(usage="python3 -m aoc.client --day=N --part=N [options]")
+    parser.add_option("-D", "--day", action="store", type="int",
+                      help="The day to solve.")
+    parser.add_option("-p", "--part", action="store",
+                      help="Choose which part to solve (1, 2 or both).")
+    parser.add_option("-i", "--input", action="store", metavar="PATH",
+                      help="Have the daemon read the input from PATH instead of stdin.")
+    parser.add_option("-s", "--socket", action="store", default=SOCKET_PATH,
+                      metavar="PATH", help="The daemon's Unix domain socket.")
+    parser.add_option("--timings", action="store", metavar="FILE",
+                      help="Append a JSON record of the phase timings to FILE "
+                      "(- for stderr).")
+    return parser
+
+def main():
+    parser = make_parser()
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+    if options.day is None:
+        parser.error("please specify --day")
+    if options.part not in ["1", "2", "both"]:
+        parser.error("please specify --part=1, --part=2 or --part=both")
+    part = options.part if options.part == "both" else int(options.part)
+
+    data = None
+    if options.input is None:
+        data = sys.stdin.buffer.read()
+    try:
+        reply = send_request(options.socket, options.day, part, data, options.input)
+    except OSError as e:
+        print("Unable to reach the daemon at %s: %s" % (options.socket, e),
+              file=sys.stderr)
+        sys.exit(2)
+    if reply.get("error") is not None:
+        print(reply["error"], file=sys.stderr)
+        sys.exit(1)
+    if part == "both":
+        for part_answer in reply["answer"]:
+            print(part_answer)
+    else:
+        print(reply["answer"])
+    if options.timings:
+        # Only pay for importing the instrumentation when it's needed.
+        from aoc import instrument
+        instrument.write_record(options.timings, reply)
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Estimate how the time and memory of each solve grow with the size of the input.
+
+Each day and part is solved on generated inputs (see aoc.generate) whose scale doubles at
+each step, until a solve takes longer than the time budget.  The growth exponent k in
+time = c * n**k, where n is the size of the input in bytes, is the slope of the least
+squares line through the points (log n, log time), and likewise for the peak traced
+memory.  Exponents of FLAG_EXPONENT or more are flagged, since they mean a day will break
+long before its input gets large.
+
+Usage: python3 -m aoc.complexity [--day=N ...] [--part=N] [--steps=N] [--budget=SECONDS]
+"""
+
+import math
+import sys
+from optparse import OptionParser
+
+from aoc import days, generate, instrument
+
+# The scale of the first generated input for each day.  These are chosen so that the
+# first solve takes at least a few milliseconds, and the setup costs don't dominate.
+START_SCALES = {1: 4000, 2: 4000, 3: 1000, 4: 4000, 5: 1000, 6: 8000, 7: 500, 8: 25,
+                9: 500, 10: 1000, 11: 4, 12: 26, 13: 250, 14: 20, 15: 20}
+# Growth exponents at or above this are flagged as quadratic (or worse).
+FLAG_EXPONENT = 1.5
+
+# ----------------------------------------------------------------------------------------
+def fit_exponent(sizes, values):
+    """
+    Return the slope of the least squares line through (log size, log value).
+
+    Return None if there are fewer than two distinct sizes to fit, or a value isn't
+    positive.
+    """
+    if len(set(sizes)) < 2 or any(value is None or value <= 0 for value in values):
+        return None
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(value) for value in values]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for (x, y) in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+# ----------------------------------------------------------------------------------------
+def measure_case(day, part, steps, budget, repeat=3, memory=True, seed=0):
+    """
+    Solve part of a day on inputs of doubling scale, and return a point for each size.
+
+    Stop early once a solve takes more than budget seconds.  Each point records the
+    scale, the size of the input in bytes, the fastest of repeat solves, and the peak
+    traced memory of one more solve (if memory is True).
+    """
+    module = days.load(day)
+    scale = START_SCALES.get(day, 1)
+    points = []
+    for step in range(steps):
+        data = generate.generate(day, scale, seed)
+        name = "scale=%d" % scale
+        timings = []
+        for n in range(repeat):
+            (answer, record) = instrument.measure(module.solve, part, data, name)
+            timings.append(record["total"])
+            # Don't repeat solves that are already over budget.
+            if record["total"] > budget:
+                break
+        point = {"day": day, "part": part, "scale": scale, "input_bytes": len(data),
+                 "seconds": min(timings), "peak_memory": None}
+        if memory:
+            (answer, record) = instrument.measure(module.solve, part, data, name, True)
+            point["peak_memory"] = record["peak_memory"]
+        points.append(point)
+        if point["seconds"] > budget:
+            break
+        scale *= 2
+    return points
+
+# ----------------------------------------------------------------------------------------
+def format_exponent(exponent):
+    "Return a growth exponent in big-O notation, or '-' if it couldn't be fitted."
+    return "-" if exponent is None else "O(n^%.2f)" % exponent
+
+HEADER = "Case          Sizes  Largest(B)  Time        Memory"
+
+def format_case(points):
+    "Return a line of the report for the points measured by measure_case()."
+    sizes = [point["input_bytes"] for point in points]
+    time_exponent = fit_exponent(sizes, [point["seconds"] for point in points])
+    memory_exponent = fit_exponent(sizes, [point["peak_memory"] for point in points])
+    flag = ""
+    if time_exponent is not None and time_exponent >= FLAG_EXPONENT:
+        flag = "  <- quadratic or worse"
+    line = "day%02d part%d %7d %11d  %-10s  %-10s%s" % (
+        points[0]["day"], points[0]["part"], len(points), max(sizes),
+        format_exponent(time_exponent), format_exponent(memory_exponent), flag)
+    return line.rstrip()
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return the command line parser for the complexity report."
+    parser = OptionParser(usage="python3 -m aoc.complexity [options]")
+    parser.add_option("-D", "--day", action="append", type="int", default=[],
+                      help="Measure only this day (may be repeated).")
+    parser.add_option("-p", "--part", action="store", type="int",
+                      help="Measure only this part.")
+    parser.add_option("--steps", action="store", type="int", default=5,
+                      help="The most input sizes to measure, doubling each time "
+                      "(default: 5).")
+    parser.add_option("--budget", action="store", type="float", default=2.0,
+                      help="Stop growing the input once a solve takes longer than this "
+                      "many seconds (default: 2).")
+    parser.add_option("--repeat", action="store", type="int", default=3,
+                      help="Solve each input this many times and keep the fastest "
+                      "(default: 3).")
+    parser.add_option("--seed", action="store", type="int", default=0,
+                      help="Seed for the input generators (default: 0).")
+    parser.add_option("--no-memory", action="store_false", dest="memory", default=True,
+                      help="Don't trace the peak memory of each size (faster).")
+    parser.add_option("--timings", action="store", metavar="FILE",
+                      help="Append a JSON record of each measured size to FILE.")
+    return parser
+
+def main():
+    parser = make_parser()
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+    if options.part not in [None, 1, 2]:
+        parser.error("please specify --part=1 or --part=2")
+    if options.steps < 2:
+        parser.error("at least two --steps are needed to fit the growth")
+
+    day_list = options.day or [day for day in days.find_days() if day in START_SCALES]
+    parts = [options.part] if options.part else [1, 2]
+    print(HEADER)
+    for day in day_list:
+        for part in parts:
+            points = measure_case(day, part, options.steps, options.budget,
+                                  options.repeat, options.memory, options.seed)
+            if options.timings:
+                for point in points:
+                    instrument.write_record(options.timings, point)
+            # Report each case as soon as it's measured, since some take a while.
+            print(format_case(points))
+            sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Pack (x, y) coordinates into single integers.
+
+A Plane packs a point as (y - min_y) * width + (x - min_x), so moving a point by (dx, dy)
+is adding the constant offset(dx, dy), and a difference between two nearby points is a
+small integer that can index a table.  Packed points hash much faster than tuples, need
+no tuple allocated for each move, and take a fraction of the memory in a visited set.
+
+A Plane is sized to the bounding box of the points it packs, which keeps the packed
+points small enough to be fast to hash and to fit in an array of 64-bit integers.  Every
+point in the box packs into an index from zero up to its number of cells, so a bytearray
+of that size can be used as a visited bitmap instead of a set:
+
+    plane = Plane(min_x, min_y, width)
+    visited = bytearray(plane.width * height)
+    visited[plane.pack(x, y)] = 1
+
+Points must stay within the plane's columns: a point off the side of a plane wraps
+around into the next row, and packs the same as a point inside it.  Size the plane from
+the extent of the input, with a margin for any moves beyond it.
+"""
+
+from array import array
+
+# ----------------------------------------------------------------------------------------
+class Plane(object):
+    "A packing of (x, y) for x from min_x to min_x + width - 1, and y from min_y up."
+
+    def __init__(self, min_x, min_y, width):
+        self.min_x = min_x
+        self.min_y = min_y
+        self.width = width
+
+    def pack(self, x, y):
+        "Return the packed form of the point (x, y)."
+        return (y - self.min_y) * self.width + x - self.min_x
+
+    def unpack(self, key):
+        "Return the point (x, y) that was packed as key."
+        (y, x) = divmod(key, self.width)
+        return (x + self.min_x, y + self.min_y)
+
+    def offset(self, dx, dy):
+        "Return what to add to a packed point to move it by (dx, dy)."
+        return dy * self.width + dx
+
+    def offsets(self, deltas):
+        "Return the offsets for each of a sequence of (dx, dy) moves."
+        return tuple(self.offset(dx, dy) for (dx, dy) in deltas)
+
+    def row_start(self, y):
+        "Return the smallest packed point with the given y (every larger y packs higher)."
+        return (y - self.min_y) * self.width
+
+    def pack_all(self, points):
+        "Return an array of the packed form of each (x, y) in points."
+        (min_x, min_y, width) = (self.min_x, self.min_y, self.width)
+        return array('q', [(y - min_y) * width + x - min_x for (x, y) in points])
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
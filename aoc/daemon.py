@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+A warm solver daemon listening on a Unix domain socket.
+
+Starting Python and importing a solution costs more than solving most of the early days,
+so the daemon imports every day's solution once, and then solves requests sent by
+aoc.client.  Each connection is handled in a process forked from the daemon, so clients
+are served concurrently, and a solve can't leave state behind for the next one.
+
+Usage: python3 -m aoc.daemon [--socket=PATH]
+
+A request is one line of JSON, {"day": 1, "part": 2, "size": 10443}, followed by size
+bytes of input, or {"day": 1, "part": 2, "path": "/path/to/dayNN/input"} to have the
+daemon read one of the inputs in a day's directory itself.  The reply is one line of JSON
+with the answer and the timing record from aoc.instrument, or with an error.
+
+The socket is only accessible to the user running the daemon, and the daemon refuses to
+start if another daemon is already listening on it.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from optparse import OptionParser
+
+from aoc import days, inputs, instrument
+from aoc.client import SOCKET_PATH
+
+# ----------------------------------------------------------------------------------------
+def input_allowed(path):
+    "Return True if path is a file in one of the days' directories."
+    directory = os.path.dirname(os.path.realpath(path))
+    day_dirs = [os.path.realpath(days.day_dir(day)) for day in days.find_days()]
+    return os.path.isfile(path) and directory in day_dirs
+
+def solve_request(request, data):
+    "Solve a request for the input data, and return the reply as a dictionary."
+    (day, part) = (request.get("day"), request.get("part"))
+    if part not in [1, 2, "both"]:
+        return {"error": "part must be 1, 2 or both, not %r" % (part,)}
+    if not isinstance(day, int) or not os.path.isfile(days.solution_path(day)):
+        return {"error": "there is no solution for day %r" % (day,)}
+    try:
+        module = days.load(day)
+        (answer, record) = instrument.measure(
+            module.solve, part, data, request.get("path", "<socket>"))
+    except Exception as e:
+        return {"error": "%s: %s" % (type(e).__name__, e)}
+    record["error"] = None
+    return record
+
+# ----------------------------------------------------------------------------------------
+class SolveHandler(socketserver.StreamRequestHandler):
+    "Read one request from a client, solve it, and write the reply."
+
+    def handle(self):
+        line = self.rfile.readline()
+        # A connection closed without a request is another daemon checking for this one.
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if "path" in request:
+                if not input_allowed(request["path"]):
+                    raise ValueError("the daemon only reads the inputs in the days' "
+                                     "directories")
+                data = inputs.read(request["path"])
+            else:
+                data = self.rfile.read(request["size"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            reply = {"error": "bad request: %s: %s" % (type(e).__name__, e)}
+        else:
+            reply = solve_request(request, data)
+        self.wfile.write(json.dumps(reply, default=str).encode() + b'\n')
+
+class ForkingUnixStreamServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    "A Unix domain socket server that handles each connection in a forked process."
+
+    def server_bind(self):
+        # Create the socket accessible only to its owner, instead of with the umask.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, 0o600)
+
+def daemon_listening(path):
+    "Return True if a daemon is accepting connections on the socket at path."
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+# ----------------------------------------------------------------------------------------
+def preload():
+    "Import the solution for every day, so that forked handlers start warm."
+    for day in days.find_days():
+        try:
+            days.load(day)
+        except Exception as e:
+            print("Unable to load day %d: %s: %s" % (day, type(e).__name__, e),
+                  file=sys.stderr)
+
+# ----------------------------------------------------------------------------------------
+def serve(path=SOCKET_PATH):
+    """
+    Preload the solutions, and serve requests on the Unix domain socket at path.
+
+    Raise RuntimeError if another daemon is already listening on path.
+    """
+    if daemon_listening(path):
+        raise RuntimeError("another daemon is already listening on %s" % path)
+    preload()
+    # Exit cleanly (removing the socket) when terminated.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # Remove the socket left behind by a daemon that didn't exit cleanly.
+    if os.path.exists(path):
+        os.remove(path)
+    with ForkingUnixStreamServer(path, SolveHandler) as server:
+        print("Listening on %s" % path, file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(path)
+
+def main():
+    parser = OptionParser(usage="python3 -m aoc.daemon [options]")
+    parser.add_option("-s", "--socket", action="store", default=SOCKET_PATH,
+                      metavar="PATH", help="Listen on this Unix domain socket.")
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+    try:
+        serve(options.socket)
+    except RuntimeError as e:
+        parser.error(str(e))
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
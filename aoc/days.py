@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Locate and import the solution for each day."""
+
+import importlib.util
+import os
+import re
+import sys
+
+# The top of the repository, which contains the dayNN directories.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ----------------------------------------------------------------------------------------
+def find_days(root=ROOT):
+    "Return the sorted day numbers of every dayNN directory containing a solution."
+    found = []
+    for name in os.listdir(root):
+        match = re.fullmatch(r'day(\d+)', name)
+        if match and os.path.isfile(os.path.join(root, name, 'solution.py')):
+            found.append(int(match.group(1)))
+    return sorted(found)
+
+# ----------------------------------------------------------------------------------------
+def day_dir(day):
+    "Return the directory containing the solution and inputs for a day."
+    return os.path.join(ROOT, 'day%02d' % day)
+
+# ----------------------------------------------------------------------------------------
+def solution_path(day):
+    "Return the path of the solution for a day."
+    return os.path.join(day_dir(day), 'solution.py')
+
+# ----------------------------------------------------------------------------------------
+def input_path(day, name='input'):
+    "Return the path of a named input file (e.g. input or test-input1) for a day."
+    return os.path.join(day_dir(day), name)
+
+# ----------------------------------------------------------------------------------------
+def load(day):
+    "Import the solution for a day as module dayNN and return it."
+    name = 'day%02d' % day
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, solution_path(day))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
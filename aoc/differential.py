@@ -0,0 +1,266 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Check that every engine of a day gives the same answers as its reference engine.
+
+Each day with more than one engine names the engine it was originally solved with as its
+REFERENCE_ENGINE.  For each seed, an input is generated (see aoc.generate), and each part
+is solved with the reference engine and with every other engine.  Any difference in the
+answers (or an engine raising an exception where the reference doesn't) is a mismatch,
+and the input is shrunk to as few lines as still reproduce it.  An engine that takes
+longer than the time limit on an input the reference solves fails the check too.  The
+speedup of each engine over the reference is reported for every case.  The inputs in
+REGRESSIONS are checked after the generated ones.
+
+Usage: python3 -m aoc.differential [--day=N ...] [--part=N] [--seeds=N] [--scale=N]
+"""
+
+import signal
+import sys
+from contextlib import contextmanager
+from optparse import OptionParser
+
+from aoc import days, generate, infra, instrument
+
+# The scale of the generated inputs for each day, chosen so that the reference engine
+# solves them in well under a second.  Day 15 uses its example's small search area when
+# it has fourteen sensors.
+SCALES = {8: 40, 9: 200, 12: 26, 14: 40, 15: 14}
+
+# Inputs that once made an engine fail or hang, which are checked along with the generated
+# inputs, by day and name.
+REGRESSIONS = {
+    15: {
+        # Four huge sensors and thirteen tiny ones: the index bucketed by the median
+        # radius put each huge sensor in trillions of buckets.
+        "skewed": [
+        "Sensor at x=1234565, y=2345678: closest beacon is at x=1234564, y=2345678",
+        "Sensor at x=1234562, y=2345678: closest beacon is at x=1234561, y=2345678",
+        "Sensor at x=1234559, y=2345678: closest beacon is at x=1234558, y=2345678",
+        "Sensor at x=1234556, y=2345678: closest beacon is at x=1234555, y=2345678",
+        "Sensor at x=1234553, y=2345678: closest beacon is at x=1234552, y=2345678",
+        "Sensor at x=1234550, y=2345678: closest beacon is at x=1234549, y=2345678",
+        "Sensor at x=1234547, y=2345678: closest beacon is at x=1234546, y=2345678",
+        "Sensor at x=1234544, y=2345678: closest beacon is at x=1234543, y=2345678",
+        "Sensor at x=1234541, y=2345678: closest beacon is at x=1234540, y=2345678",
+        "Sensor at x=1234538, y=2345678: closest beacon is at x=1234537, y=2345678",
+        "Sensor at x=1234535, y=2345678: closest beacon is at x=1234534, y=2345678",
+        "Sensor at x=1234532, y=2345678: closest beacon is at x=1234531, y=2345678",
+        "Sensor at x=1234529, y=2345678: closest beacon is at x=1234528, y=2345678",
+        "Sensor at x=-4000000, y=-4000000: closest beacon is at x=7580244, y=-4000000",
+        "Sensor at x=-4000000, y=8000000: closest beacon is at x=6888888, y=8000000",
+        "Sensor at x=8000000, y=-4000000: closest beacon is at x=-5111110, y=-4000000",
+        "Sensor at x=8000000, y=8000000: closest beacon is at x=-4419754, y=8000000",
+        ],
+    },
+}
+
+# ----------------------------------------------------------------------------------------
+class Timeout(Exception):
+    "Raised when a solve takes longer than its time limit."
+
+@contextmanager
+def time_limit(seconds):
+    "Raise Timeout in the body of the with statement if it takes longer than seconds."
+    def expired(signum, frame):
+        raise Timeout("took longer than %gs" % seconds)
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+# ----------------------------------------------------------------------------------------
+def run_engine(module, engine, part, data, limit):
+    """
+    Solve part of the challenge for the input data with the named engine.
+
+    Return the outcome and the time it took.  The outcome is ("answer", answer) or
+    ("error", message), or None if the solve took longer than limit seconds.
+    """
+    previous = getattr(infra.options, "engine", None)
+    infra.options.engine = engine
+    try:
+        with time_limit(limit):
+            (answer, record) = instrument.measure(module.solve, part, data)
+        return (("answer", answer), record["total"])
+    except Timeout:
+        return (None, limit)
+    except Exception as e:
+        return (("error", "%s: %s" % (type(e).__name__, e)), None)
+    finally:
+        infra.options.engine = previous
+
+def mismatch(reference, outcome):
+    "Return True if an engine's outcome differs from a successful reference outcome."
+    if reference is None or outcome is None or reference[0] != "answer":
+        return False
+    return outcome != reference
+
+# ----------------------------------------------------------------------------------------
+def to_data(lines):
+    "Return the lines of an input as bytes."
+    return ''.join(line + '\n' for line in lines).encode()
+
+def shrink(lines, failing):
+    """
+    Return as few of the lines as still make failing(lines) return True.
+
+    Chunks of lines are removed while the input still fails, halving the size of the
+    chunks each time round, and then single lines are removed until none can be.
+    """
+    chunk = max(len(lines) // 2, 1)
+    while True:
+        removed = False
+        n = 0
+        while n < len(lines):
+            candidate = lines[:n] + lines[n + chunk:]
+            if candidate and failing(candidate):
+                lines = candidate
+                removed = True
+            else:
+                n += chunk
+        if chunk == 1 and not removed:
+            return lines
+        chunk = max(chunk // 2, 1)
+
+def check_case(module, part, engine, lines, limit, shrinking=True):
+    """
+    Compare an engine with the reference engine on a generated input.
+
+    Return a result with the outcomes, the times and the speedup of the engine, and (if
+    they differ) the shrunk input that still makes them differ.
+    """
+    data = to_data(lines)
+    (reference, reference_time) = run_engine(
+        module, module.REFERENCE_ENGINE, part, data, limit)
+    (outcome, engine_time) = run_engine(module, engine, part, data, limit)
+    result = {"reference": reference, "outcome": outcome,
+              "reference_time": reference_time, "engine_time": engine_time,
+              "speedup": None, "mismatch": False, "shrunk": None}
+    if reference_time and engine_time and reference is not None and outcome is not None:
+        result["speedup"] = reference_time / engine_time
+    if mismatch(reference, outcome):
+        result["mismatch"] = True
+        if shrinking:
+            def failing(candidate):
+                data = to_data(candidate)
+                reference = run_engine(module, module.REFERENCE_ENGINE, part, data,
+                                       limit)[0]
+                return mismatch(reference, run_engine(module, engine, part, data,
+                                                      limit)[0])
+            result["shrunk"] = shrink(lines, failing)
+    return result
+
+# ----------------------------------------------------------------------------------------
+HEADER = "Case          Seed  Scale  Engine    Reference  Engine     Speedup  Result"
+
+def format_time(seconds):
+    "Return a time in seconds for the report, or '-' if there isn't one."
+    return "-" if seconds is None else "%.4fs" % seconds
+
+def format_result(day, part, seed, scale, engine, result):
+    """
+    Return the line of the report for the result of check_case().
+
+    A regression case has its name in place of the seed, and no scale.
+    """
+    speedup = "-" if result["speedup"] is None else "%.2fx" % result["speedup"]
+    if result["mismatch"]:
+        status = "MISMATCH"
+    elif result["reference"] is None or result["outcome"] is None:
+        status = "timeout"
+    elif result["reference"][0] == "error":
+        status = "skipped (reference failed)"
+    else:
+        status = "ok"
+    return "day%02d part%d %6s %6s  %-8s  %-9s  %-9s  %7s  %s" % (
+        day, part, seed, scale, engine, format_time(result["reference_time"]),
+        format_time(result["engine_time"]), speedup, status)
+
+def format_mismatch(result):
+    "Return the lines describing a mismatch and the shrunk input reproducing it."
+    report = ["    reference: %s" % (result["reference"],),
+              "    engine:    %s" % (result["outcome"],)]
+    if result["shrunk"] is not None:
+        report.append("    shrunk to %d lines:" % len(result["shrunk"]))
+        report.extend("      " + line for line in result["shrunk"])
+    return report
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return the command line parser for the differential tests."
+    parser = OptionParser(usage="python3 -m aoc.differential [options]")
+    parser.add_option("-D", "--day", action="append", type="int", default=[],
+                      help="Check only this day (may be repeated).")
+    parser.add_option("-p", "--part", action="store", type="int",
+                      help="Check only this part.")
+    parser.add_option("--seeds", action="store", type="int", default=10,
+                      help="The number of inputs to generate for each day (default: 10).")
+    parser.add_option("--first-seed", action="store", type="int", default=0,
+                      help="The seed of the first generated input (default: 0).")
+    parser.add_option("--scale", action="store", type="int",
+                      help="Generate inputs of this scale instead of each day's default.")
+    parser.add_option("--time-limit", action="store", type="float", default=10.0,
+                      help="Give up on a solve after this many seconds (default: 10).")
+    parser.add_option("--no-shrink", action="store_false", dest="shrink", default=True,
+                      help="Report mismatches without shrinking their inputs.")
+    return parser
+
+def main():
+    parser = make_parser()
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+    if options.part not in [None, 1, 2]:
+        parser.error("please specify --part=1 or --part=2")
+
+    day_list = options.day or [day for day in days.find_days() if day in SCALES]
+    parts = [options.part] if options.part else [1, 2]
+    print(HEADER)
+    cases = 0
+    mismatches = 0
+    timeouts = 0
+    for day in day_list:
+        module = days.load(day)
+        if not hasattr(module, "REFERENCE_ENGINE"):
+            parser.error("day %d has no reference engine to check against" % day)
+        scale = options.scale or SCALES.get(day, 1)
+        engines = [engine for engine in module.ENGINES
+                   if engine != module.REFERENCE_ENGINE]
+        inputs = [(seed, scale, list(generate.generate_lines(day, scale, seed)))
+                  for seed in range(options.first_seed,
+                                    options.first_seed + options.seeds)]
+        inputs += [(name, "-", lines)
+                   for (name, lines) in sorted(REGRESSIONS.get(day, {}).items())]
+        for (seed, input_scale, lines) in inputs:
+            for part in parts:
+                for engine in engines:
+                    result = check_case(module, part, engine, lines, options.time_limit,
+                                        options.shrink)
+                    cases += 1
+                    print(format_result(day, part, seed, input_scale, engine, result))
+                    if result["mismatch"]:
+                        mismatches += 1
+                        for line in format_mismatch(result):
+                            print(line)
+                    elif result["outcome"] is None and result["reference"] is not None:
+                        # The engine hung on an input that the reference solved.
+                        timeouts += 1
+                    sys.stdout.flush()
+    print("Checked %d cases, %d mismatches, %d engine timeouts." % (
+        cases, mismatches, timeouts))
+    if mismatches > 0 or timeouts > 0:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
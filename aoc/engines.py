@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Choose between the engines (alternative algorithms) that a solution has for its input.
+
+The fastest algorithm often depends on the shape of the input rather than its size.  A
+solution with more than one engine lists their names in ENGINES, gathers cheap statistics
+about its input (extents, counts, density) in a pre-pass, and lets select() pick one:
+
+    with phase("stats"):
+        stats = input_stats(motions)
+    engine = select(ENGINES, stats, choose_engine)
+
+The --engine option forces a choice instead.  The chosen engine and the statistics it was
+chosen from are added to the timing record of the solve.  REFERENCE_ENGINE names the
+engine that aoc.differential checks the others against, which is the algorithm the puzzle
+was first solved with, kept as an engine even if choose() never picks it.
+"""
+
+from aoc import instrument
+from aoc.infra import debugf, options
+
+# ----------------------------------------------------------------------------------------
+def select(engines, stats, choose):
+    """
+    Return the name of the engine to use for an input with the given statistics.
+
+    The engine is the one forced by the --engine option, or else choose(stats).  Raise
+    ValueError if the engine isn't one of engines.
+    """
+    name = getattr(options, "engine", None) or choose(stats)
+    if name not in engines:
+        raise ValueError("unknown engine %r (expected one of %s)" % (
+            name, ", ".join(engines)))
+    debugf("Using the %s engine for %s", name, stats)
+    record = instrument.current
+    if record is not None:
+        record["engine"] = name
+        record["input_stats"] = stats
+    return name
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Extract the integers from the challenge input in bulk.
+
+Most inputs are numbers wrapped in fixed text ("Sensor at x=2, y=18: ...", "move 1 from 2
+to 1"), and parsing them with chained replace(), split() and int() on each line costs
+several Python calls per number.  Here the whole buffer is translated in one pass so that
+every byte that can't be part of an integer becomes a space, split once, and converted
+into an array of signed 64-bit integers:
+
+    flat = integer_records(data, 4)
+    sensors = list(each_record(flat, 4))
+
+All of that runs in C.  A minus sign that isn't the sign of a number (the hyphen in
+"2-4" or the arrow in "0,1 -> 3,1") leaves a field that isn't an integer behind, and then
+the integers are found with a regular expression instead, which is exact but several times
+slower.  Inputs whose numbers are never negative should pass signed=False, which treats
+every minus sign as a separator.
+"""
+
+import re
+from array import array
+
+from aoc.inputs import split_lines, to_bytes
+
+def make_table(keep):
+    "Return a translation table that maps every byte except those in keep to a space."
+    return bytes(byte if byte in keep else ord(' ') for byte in range(256))
+
+# The translation tables for signed and unsigned integers, and for keeping the lines.
+SIGNED = make_table(b'-0123456789')
+UNSIGNED = make_table(b'0123456789')
+SIGNED_LINES = make_table(b'-0123456789\n')
+UNSIGNED_LINES = make_table(b'0123456789\n')
+# An optionally negative integer, where a minus sign straight after a digit is a hyphen.
+INTEGER = re.compile(rb'(?<![0-9])-?[0-9]+')
+
+# ----------------------------------------------------------------------------------------
+def integers(data, signed=True):
+    "Return an array of every integer in data, in order."
+    data = to_bytes(data)
+    fields = data.translate(SIGNED if signed else UNSIGNED).split()
+    try:
+        return array('q', map(int, fields))
+    except ValueError:
+        return array('q', map(int, INTEGER.findall(data)))
+
+def integer_lines(data, signed=True):
+    "Return an array of the integers on each line of data (empty if a line has none)."
+    data = to_bytes(data)
+    text = data.translate(SIGNED_LINES if signed else UNSIGNED_LINES)
+    try:
+        return [array('q', map(int, line.split())) for line in text.splitlines()]
+    except ValueError:
+        findall = INTEGER.findall
+        return [array('q', map(int, findall(line))) for line in split_lines(data)]
+
+def integer_records(data, width, signed=True):
+    """
+    Return a flat array of every integer in data, which are records of width integers.
+
+    Raise ValueError if the number of integers isn't a multiple of width.
+    """
+    flat = integers(data, signed)
+    if len(flat) % width != 0:
+        raise ValueError("expected records of %d integers, but found %d integers" % (
+            width, len(flat)))
+    return flat
+
+def each_record(flat, width):
+    "Return an iterator over the records in a flat array as tuples of width integers."
+    return zip(*[iter(flat)] * width)
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
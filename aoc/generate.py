@@ -0,0 +1,369 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Generate synthetic challenge inputs at a chosen scale.
+
+Each generator takes a seeded random.Random and a scale, and yields the lines of a valid
+input for that day.  The same day, scale and seed always produce the same input.  What
+the scale counts depends on the day (elves, rounds, grid size, sensors, ...), and is
+described by each generator's docstring.
+
+Usage: python3 -m aoc.generate --day=N --scale=K [--seed=S] [--output=FILE]
+"""
+
+import random
+import string
+import sys
+from optparse import OptionParser
+
+# ----------------------------------------------------------------------------------------
+def gen_day01(rng, scale):
+    "Scale is the number of elves, each carrying one to ten snacks."
+    for elf in range(scale):
+        if elf > 0:
+            yield ""
+        for item in range(rng.randint(1, 10)):
+            yield str(rng.randint(1000, 60000))
+
+# ----------------------------------------------------------------------------------------
+def gen_day02(rng, scale):
+    "Scale is the number of rounds in the strategy guide."
+    for n in range(scale):
+        yield "%s %s" % (rng.choice("ABC"), rng.choice("XYZ"))
+
+# ----------------------------------------------------------------------------------------
+def gen_day03(rng, scale):
+    """
+    Scale is the number of groups of three elves.
+
+    Each rucksack has exactly one item in both compartments, and each group has exactly
+    one badge item that all three elves carry.
+    """
+    letters = string.ascii_letters
+    for group in range(scale):
+        badge = rng.choice(letters)
+        others = [letter for letter in letters if letter != badge]
+        rng.shuffle(others)
+        for elf in range(3):
+            # Each elf draws from their own pool of letters, so only the badge is shared.
+            pool = others[elf * 17:(elf + 1) * 17]
+            shared = rng.choice(pool + [badge])
+            pool = [letter for letter in pool if letter != shared]
+            (left_pool, right_pool) = (pool[:8], pool[8:16])
+            size = rng.randint(4, 16)
+            left = [shared] + [rng.choice(left_pool) for n in range(size - 1)]
+            right = [shared] + [rng.choice(right_pool) for n in range(size - 1)]
+            # The badge must be in one of the compartments (if it isn't already both).
+            if shared != badge:
+                rng.choice([left, right])[-1] = badge
+            rng.shuffle(left)
+            rng.shuffle(right)
+            yield ''.join(left) + ''.join(right)
+
+# ----------------------------------------------------------------------------------------
+def gen_day04(rng, scale):
+    "Scale is the number of pairs of section assignments."
+    for n in range(scale):
+        ranges = []
+        for elf in range(2):
+            low = rng.randint(1, 99)
+            high = rng.randint(low, 99)
+            ranges.append("%d-%d" % (low, high))
+        yield ','.join(ranges)
+
+# ----------------------------------------------------------------------------------------
+def gen_day05(rng, scale):
+    "Scale is the number of moves, rearranging nine stacks of crates."
+    num_stacks = 9
+    stacks = [[rng.choice(string.ascii_uppercase) for n in range(rng.randint(1, 8))]
+              for s in range(num_stacks)]
+    # Draw the stacks from the top down.  Stack bottoms are first in each list.
+    for level in range(max(len(stack) for stack in stacks) - 1, -1, -1):
+        cells = []
+        for stack in stacks:
+            cells.append("[%s]" % stack[level] if level < len(stack) else "   ")
+        yield ' '.join(cells).rstrip()
+    yield ' '.join(" %d " % (s + 1) for s in range(num_stacks))
+    yield ""
+    # The heights of the stacks are the same in both parts, so only track the heights.
+    heights = [len(stack) for stack in stacks]
+    for n in range(scale):
+        from_stack = rng.choice([s for s in range(num_stacks) if heights[s] > 0])
+        to_stack = rng.choice([s for s in range(num_stacks) if s != from_stack])
+        count = rng.randint(1, heights[from_stack])
+        heights[from_stack] -= count
+        heights[to_stack] += count
+        yield "move %d from %d to %d" % (count, from_stack + 1, to_stack + 1)
+
+# ----------------------------------------------------------------------------------------
+def gen_day06(rng, scale):
+    """
+    Scale is the length of the datastream.
+
+    The stream only uses three letters until the very end, so that both the packet and
+    message markers are found after scanning the whole stream.
+    """
+    stream = [rng.choice("abc") for n in range(max(scale - 14, 0))]
+    yield ''.join(stream) + "defghijklmnopq"
+
+# ----------------------------------------------------------------------------------------
+def gen_day07(rng, scale):
+    """
+    Scale is the number of directories.
+
+    New directories are usually created inside the most recently created one, which
+    makes the tree much deeper than the challenge input (up to 200 levels).
+    """
+    max_depth = 200
+    # Each directory is (name, depth, children, files).
+    root = ("/", 0, [], [])
+    directories = [root]
+    for n in range(scale):
+        parent = directories[-1]
+        if parent[1] >= max_depth or rng.random() < 0.3:
+            parent = rng.choice(directories)
+        name = "d%d%s" % (n, rng.choice(string.ascii_lowercase))
+        directory = (name, parent[1] + 1, [], [])
+        parent[2].append(directory)
+        directories.append(directory)
+    # Files total roughly 45M bytes, so that part two has to free some space.
+    mean_size = max(45000000 // (scale * 2 + 1), 1)
+    for (n, directory) in enumerate(directories):
+        for f in range(rng.randint(0, 4)):
+            directory[3].append(("f%d%d.%s" % (n, f, rng.choice(["txt", "dat", "log"])),
+                                 rng.randint(1, 2 * mean_size)))
+    # Walk the tree depth first, without recursion, listing each directory as we go.
+    yield "$ cd /"
+    stack = [("list", root)]
+    while stack:
+        (action, directory) = stack.pop()
+        if action == "up":
+            yield "$ cd .."
+            continue
+        if directory is not root:
+            yield "$ cd %s" % directory[0]
+        yield "$ ls"
+        for child in directory[2]:
+            yield "dir %s" % child[0]
+        for (name, size) in directory[3]:
+            yield "%d %s" % (size, name)
+        for child in reversed(directory[2]):
+            stack.append(("up", child))
+            stack.append(("list", child))
+
+# ----------------------------------------------------------------------------------------
+def gen_day08(rng, scale):
+    "Scale is the width and height of the grid of trees."
+    for row in range(scale):
+        yield ''.join(rng.choice(string.digits) for column in range(scale))
+
+# ----------------------------------------------------------------------------------------
+def gen_day09(rng, scale):
+    "Scale is the number of head motions."
+    for n in range(scale):
+        yield "%s %d" % (rng.choice("RLUD"), rng.randint(1, 20))
+
+# ----------------------------------------------------------------------------------------
+def gen_day10(rng, scale):
+    """
+    Scale is the number of instructions (at least 240, which fills the screen).
+
+    The X register wanders around the 40 columns of the screen.
+    """
+    X = 1
+    for n in range(max(scale, 240)):
+        if rng.random() < 0.3:
+            yield "noop"
+        else:
+            value = rng.randint(-5, 5)
+            if not 0 <= X + value < 40:
+                value = -value
+            X += value
+            yield "addx %d" % value
+
+# ----------------------------------------------------------------------------------------
+def gen_day11(rng, scale):
+    """
+    Scale is the number of monkeys (at least two).
+
+    Every divisor is a distinct prime, so that part two's reduction is still exact.  Part
+    one divides the worry level as a float, so no monkey squares the worry level and the
+    multipliers are small enough that items can pass through hundreds of monkeys without
+    overflowing.
+    """
+    num_monkeys = max(scale, 2)
+    primes = []
+    candidate = 2
+    while len(primes) < num_monkeys:
+        if all(candidate % p != 0 for p in primes):
+            primes.append(candidate)
+        candidate += 1
+    rng.shuffle(primes)
+    for num in range(num_monkeys):
+        if num > 0:
+            yield ""
+        yield "Monkey %d:" % num
+        items = [rng.randint(50, 99) for n in range(rng.randint(1, 8))]
+        yield "  Starting items: %s" % ', '.join(str(item) for item in items)
+        if rng.random() < 0.5:
+            yield "  Operation: new = old * %d" % rng.randint(2, 3)
+        else:
+            yield "  Operation: new = old + %d" % rng.randint(1, 9)
+        yield "  Test: divisible by %d" % primes[num]
+        targets = rng.sample([m for m in range(num_monkeys) if m != num],
+                             min(2, num_monkeys - 1))
+        yield "    If true: throw to monkey %d" % targets[0]
+        yield "    If false: throw to monkey %d" % targets[-1]
+
+# ----------------------------------------------------------------------------------------
+def gen_day12(rng, scale):
+    """
+    Scale is the width and height of the heightmap (at least 26).
+
+    The top row climbs steadily from S in the left corner to E in the right corner, which
+    guarantees a path.  The rest of the map is randomly lowered from that slope.
+    """
+    size = max(scale, 26)
+    for row in range(size):
+        cells = []
+        for column in range(size):
+            elevation = column * 25 // (size - 1)
+            if row > 0:
+                elevation = max(elevation - rng.randint(0, 3), 0)
+            cells.append(chr(ord('a') + elevation))
+        if row == 0:
+            cells[0] = 'S'
+            cells[-1] = 'E'
+        yield ''.join(cells)
+
+# ----------------------------------------------------------------------------------------
+def gen_packet(rng, depth):
+    "Return a random packet (nested list of integers) as a string."
+    terms = []
+    for n in range(rng.randint(0, 5)):
+        if depth > 0 and rng.random() < 0.3:
+            terms.append(gen_packet(rng, depth - 1))
+        else:
+            terms.append(str(rng.randint(0, 10)))
+    return "[%s]" % ','.join(terms)
+
+def gen_day13(rng, scale):
+    "Scale is the number of pairs of packets."
+    for n in range(scale):
+        if n > 0:
+            yield ""
+        yield gen_packet(rng, 4)
+        yield gen_packet(rng, 4)
+
+# ----------------------------------------------------------------------------------------
+def gen_day14(rng, scale):
+    """
+    Scale is the depth of the cave, with one rock path for every four rows.
+
+    A cup at the bottom of the cave catches the sand in part one, and the other rocks stay
+    within the columns the sand can reach, which is how the solution sizes its grid.
+    """
+    max_y = max(scale, 4)
+    width = max_y // 3
+    yield "%d,%d -> %d,%d -> %d,%d -> %d,%d" % (
+        500 - width, max_y - width, 500 - width, max_y,
+        500 + width, max_y, 500 + width, max_y - width)
+    for n in range(max_y // 4):
+        x = rng.randint(500 - max_y, 500 + max_y)
+        y = rng.randint(1, max_y)
+        points = ["%d,%d" % (x, y)]
+        for segment in range(rng.randint(1, 4)):
+            if segment % 2 == 0:
+                x = min(max(x + rng.randint(-10, 10), 500 - max_y), 500 + max_y)
+            else:
+                y = min(max(y + rng.randint(-5, 5), 1), max_y)
+            points.append("%d,%d" % (x, y))
+        yield ' -> '.join(points)
+
+# ----------------------------------------------------------------------------------------
+def gen_day15(rng, scale):
+    """
+    Scale is the number of sensors (at least five).
+
+    A hidden distress beacon location is chosen first, and every sensor's closest beacon
+    is nearer than that location.  Four sensors far outside the search area, one in each
+    diagonal direction, cover every other location, so the solution is unique.
+    """
+    num_sensors = max(scale, 5)
+    # The solution uses the example's search limit when there are fourteen sensors.
+    limit = 20 if num_sensors == 14 else 4000000
+    (hx, hy) = (rng.randint(0, limit), rng.randint(0, limit))
+    sensors = [(rng.randint(0, limit), rng.randint(0, limit))
+               for n in range(num_sensors - 4)]
+    sensors += [(-limit, -limit), (-limit, 2 * limit), (2 * limit, -limit),
+                (2 * limit, 2 * limit)]
+    for (sx, sy) in sensors:
+        radius = max(abs(sx - hx) + abs(sy - hy) - 1, 0)
+        dx = rng.randint(-radius, radius)
+        dy = (radius - abs(dx)) * rng.choice([-1, 1])
+        yield "Sensor at x=%d, y=%d: closest beacon is at x=%d, y=%d" % (
+            sx, sy, sx + dx, sy + dy)
+
+# ----------------------------------------------------------------------------------------
+# The generator for each day.
+GENERATORS = {
+    1: gen_day01, 2: gen_day02, 3: gen_day03, 4: gen_day04, 5: gen_day05,
+    6: gen_day06, 7: gen_day07, 8: gen_day08, 9: gen_day09, 10: gen_day10,
+    11: gen_day11, 12: gen_day12, 13: gen_day13, 14: gen_day14, 15: gen_day15,
+}
+
+def generate_lines(day, scale, seed=0):
+    "Yield the lines of a generated input for day at the given scale."
+    return GENERATORS[day](random.Random(seed), scale)
+
+def generate(day, scale, seed=0):
+    "Return a generated input for day at the given scale as bytes."
+    return ''.join(line + '\n' for line in generate_lines(day, scale, seed)).encode()
+
+def write(fh, day, scale, seed=0):
+    "Write a generated input for day at the given scale to a text file."
+    for line in generate_lines(day, scale, seed):
+        fh.write(line)
+        fh.write('\n')
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return the command line parser for the generator."
+    parser = OptionParser(usage="python3 -m aoc.generate [options]")
+    parser.add_option("-D", "--day", action="store", type="int",
+                      help="Generate an input for this day.")
+    parser.add_option("-n", "--scale", action="store", type="int",
+                      help="The size of the input (what is counted depends on the day).")
+    parser.add_option("-s", "--seed", action="store", type="int", default=0,
+                      help="Random seed (default: 0).")
+    parser.add_option("-o", "--output", action="store",
+                      help="Write the input to this file instead of stdout.")
+    return parser
+
+def main():
+    parser = make_parser()
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+
+    if options.day not in GENERATORS:
+        parser.error("please specify --day between 1 and %d" % max(GENERATORS))
+
+    if options.scale is None or options.scale < 1:
+        parser.error("please specify a positive --scale")
+
+    if options.output is None:
+        write(sys.stdout, options.day, options.scale, options.seed)
+    else:
+        with open(options.output, 'w') as fh:
+            write(fh, options.day, options.scale, options.seed)
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
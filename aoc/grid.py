@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+A two dimensional grid of bytes, stored row by row in one flat bytearray.
+
+A cell is addressed either by (row, column) or by its index in the bytearray.  Moving
+north, east, south or west from an index is adding one of the grid's offsets, so hot loops
+work on indexes and never build coordinate tuples.  A grid can be surrounded by a border
+of cells holding a value that never occurs inside the grid, so that walking off an edge
+is detected by looking at the cell rather than checking the bounds.
+"""
+
+# ----------------------------------------------------------------------------------------
+class Grid(object):
+    "A width by height grid of byte values, optionally surrounded by a border."
+
+    def __init__(self, width, height, fill=ord('.'), border=None):
+        self.width = width
+        self.height = height
+        self.border = border
+        self.pad = 0 if border is None else 1
+        # The distance between vertically adjacent cells.
+        self.stride = width + 2 * self.pad
+        self.cells = bytearray([fill]) * (self.stride * (height + 2 * self.pad))
+        if border is not None:
+            self.cells[:self.stride] = bytes([border]) * self.stride
+            self.cells[-self.stride:] = bytes([border]) * self.stride
+            for row in range(height):
+                start = self.index(row, 0)
+                self.cells[start - 1] = border
+                self.cells[start + width] = border
+        # The offsets to the neighbors of a cell: north, east, south and west.
+        self.offsets = (-self.stride, 1, self.stride, -1)
+
+    @classmethod
+    def from_rows(cls, rows, border=None):
+        "Return a grid made from equal length rows of bytes (or memoryviews of bytes)."
+        rows = list(rows)
+        grid = cls(len(rows[0]) if rows else 0, len(rows), border=border)
+        for (row, cells) in enumerate(rows):
+            start = grid.index(row, 0)
+            grid.cells[start:start + grid.width] = cells
+        return grid
+
+    def index(self, row, column):
+        "Return the index of the cell at row and column."
+        return (row + self.pad) * self.stride + column + self.pad
+
+    def position(self, index):
+        "Return the (row, column) of the cell at index."
+        (row, column) = divmod(index, self.stride)
+        return (row - self.pad, column - self.pad)
+
+    def __getitem__(self, position):
+        (row, column) = position
+        return self.cells[(row + self.pad) * self.stride + column + self.pad]
+
+    def __setitem__(self, position, value):
+        (row, column) = position
+        self.cells[(row + self.pad) * self.stride + column + self.pad] = value
+
+    def indexes(self):
+        "Yield the index of every cell inside the border, row by row."
+        for row in range(self.height):
+            start = self.index(row, 0)
+            yield from range(start, start + self.width)
+
+    def neighbors(self, index):
+        "Return the indexes of the cells north, east, south and west of index."
+        return [index + offset for offset in self.offsets]
+
+    def find(self, value):
+        "Return the index of the first cell holding value, or -1 if there isn't one."
+        return self.cells.find(value)
+
+    def row(self, row):
+        "Return a memoryview of the cells in a row."
+        start = self.index(row, 0)
+        return memoryview(self.cells)[start:start + self.width]
+
+    def column(self, column):
+        "Return the cells in a column as bytes."
+        return bytes(self.cells[self.index(0, column):self.index(self.height, column):
+                                self.stride])
+
+    def copy(self, height=None, fill=ord('.')):
+        "Return a copy of the grid, with rows of fill added (or rows removed) for height."
+        if height is None or height == self.height:
+            grid = Grid.__new__(Grid)
+            grid.__dict__.update(self.__dict__)
+            grid.cells = bytearray(self.cells)
+            return grid
+        grid = Grid(self.width, height, fill, self.border)
+        for row in range(min(height, self.height)):
+            start = grid.index(row, 0)
+            grid.cells[start:start + self.width] = self.row(row)
+        return grid
+
+    def render(self):
+        "Return the grid (without its border) as a string of lines."
+        return '\n'.join(self.row(row).tobytes().decode('latin-1')
+                         for row in range(self.height))
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Advent of code infrastructure shared by every day's solution.
+
+Each solution exposes solve(part, data), which takes the challenge input as bytes or str
+(or any bytes-like buffer, such as the memory map returned by aoc.inputs.read()) and
+returns the answer.  When part is "both", the input is parsed once and solve() returns
+a tuple of the answers to both parts.  Nothing here touches sys.argv or sys.stdin until
+main() is called, so the solutions can be imported and solved repeatedly in a single
+process.
+"""
+
+import sys
+from optparse import OptionParser, Values
+
+from aoc import batch, inputs, instrument, profiling, trace
+
+# The options in effect for the current process.  Solutions that are imported instead of
+# being run from the command line get these defaults.
+options = Values({"debug": False, "part": None})
+
+def debug(*args, **kwargs):
+    if options.debug:
+        print(*args, **kwargs)
+
+def debugf(fmt, *args, **kwargs):
+    """
+    Print fmt % args when debugging.
+
+    The message is only formatted when debugging is enabled, so that hot loops don't pay
+    for formatting on every iteration.  Call sites whose arguments are expensive to
+    compute should be guarded with "if options.debug:" instead.
+    """
+    if options.debug:
+        print(fmt % args, **kwargs)
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return a command line parser with the options common to every solution."
+    parser = OptionParser()
+    parser.add_option("-d", "--debug", action="store_true",
+                      help="Emit additional debugging messages.")
+    parser.add_option("-p", "--part", action="store",
+                      help="Choose which part to solve (1, 2 or both).")
+    parser.add_option("-i", "--input", action="store", metavar="PATH",
+                      help="Read the input from PATH (memory-mapped) instead of stdin.")
+    parser.add_option("--batch", action="store", metavar="PATH",
+                      help="Solve every input file in the directory PATH (or listed in "
+                      "the file PATH) in parallel, writing a line of JSON per file.")
+    parser.add_option("-j", "--jobs", action="store", type="int",
+                      help="Number of worker processes for --batch (default: number of "
+                      "cores).")
+    parser.add_option("--timings", action="store", metavar="FILE",
+                      help="Append a JSON record of the phase timings to FILE "
+                      "(- for stderr).")
+    parser.add_option("--memory", action="store_true",
+                      help="Report the peak memory and top allocations of each phase.")
+    parser.add_option("--stats", action="store_true",
+                      help="Report the operations counted by the solve, per second and "
+                      "per byte of input.")
+    parser.add_option("--profile", action="store_true",
+                      help="Profile the solve into dayNN-partN.{txt,pstats,collapsed}.")
+    parser.add_option("--profile-prefix", action="store", metavar="PREFIX",
+                      help="Write the profile to PREFIX.{txt,pstats,collapsed} instead.")
+    parser.add_option("--trace", action="store", metavar="FILE",
+                      help="Write structured trace events to FILE as lines of JSON.")
+    parser.add_option("--trace-rate", action="append", metavar="TYPE=RATE", default=[],
+                      help="Keep this fraction of the trace events of TYPE (* for every "
+                      "other type).  May be repeated.")
+    parser.add_option("--trace-ring", action="store", type="int", metavar="N",
+                      help="Write only the last N sampled trace events, when the solve "
+                      "finishes.")
+    parser.add_option("--engine", action="store", metavar="NAME",
+                      help="Force the solution to use the named engine instead of "
+                      "choosing one from its input.")
+    return parser
+
+# ----------------------------------------------------------------------------------------
+def lines(data):
+    """
+    Yield each line of the challenge input with the trailing whitespace removed.
+
+    The whole input is decoded at once.  Parsers that can work on bytes should use the
+    bulk splitting in aoc.inputs instead.
+    """
+    if not isinstance(data, str):
+        data = bytes(data).decode()
+    for line in data.splitlines():
+        yield line.rstrip()
+
+# ----------------------------------------------------------------------------------------
+def main(solve, parser=None, follow=None):
+    """
+    Solve the challenge input read from stdin as directed by the command line.
+
+    A solution that can follow an input as it's appended to passes a parser with a
+    --follow option, and follow(part, path), which is called instead of solving the input
+    once when --follow is given.
+    """
+    if parser is None:
+        parser = make_parser()
+    (opts, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+
+    if opts.part not in ["1", "2", "both"]:
+        parser.error("please specify --part=1, --part=2 or --part=both")
+    if opts.part != "both":
+        opts.part = int(opts.part)
+    if opts.engine is not None:
+        engines = getattr(sys.modules.get(solve.__module__), "ENGINES", ())
+        if not engines:
+            parser.error("--engine isn't supported, this solution has only one engine")
+        if opts.engine not in engines:
+            parser.error("--engine must be one of: %s" % ", ".join(engines))
+    if (opts.trace_rate or opts.trace_ring) and not opts.trace:
+        parser.error("--trace-rate and --trace-ring require --trace")
+    try:
+        rates = trace.parse_rates(opts.trace_rate)
+    except ValueError as e:
+        parser.error("--trace-rate: %s" % e)
+
+    options.__dict__.update(vars(opts))
+    if follow is not None and opts.follow:
+        if opts.input is None:
+            parser.error("--follow requires --input")
+        if opts.batch or opts.profile or opts.profile_prefix or opts.trace or opts.memory:
+            parser.error("--follow can't be combined with --batch, --profile, --trace or "
+                         "--memory")
+        follow(opts.part, opts.input)
+        return
+    if opts.batch:
+        if (opts.input or opts.profile or opts.profile_prefix or opts.trace
+                or opts.timings or opts.stats):
+            parser.error("--batch can't be combined with --input, --profile, --trace, "
+                         "--timings or --stats")
+        results = batch.run_batch(solve, opts.part, batch.batch_paths(opts.batch),
+                                  opts.jobs, opts.memory)
+        if batch.write_results(sys.stdout, results) > 0:
+            sys.exit(1)
+        return
+    data = inputs.read(opts.input)
+    input_name = opts.input or "<stdin>"
+    if opts.trace:
+        trace.start(opts.trace, rates, opts.trace_ring)
+    try:
+        if opts.profile or opts.profile_prefix:
+            prefix = opts.profile_prefix
+            if prefix is None:
+                prefix = "day%02d-part%s" % (instrument.solve_day(solve) or 0, opts.part)
+            (answer, record) = profiling.run(
+                prefix, instrument.measure, solve, opts.part, data, input_name,
+                opts.memory)
+        else:
+            (answer, record) = instrument.measure(
+                solve, opts.part, data, input_name, opts.memory)
+    finally:
+        trace.stop()
+    if opts.part == "both":
+        for part_answer in answer:
+            print(part_answer)
+    else:
+        print(answer)
+    if opts.memory:
+        for line in instrument.format_memory(record):
+            print(line, file=sys.stderr)
+    if opts.stats:
+        for line in instrument.format_ops(record):
+            print(line, file=sys.stderr)
+    if opts.timings:
+        instrument.write_record(opts.timings, record)
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Read the challenge input once as a single buffer, and split it in bulk.
+
+read() returns the whole input as one bytes-like buffer, memory-mapped when it comes from
+a file, so even very large generated inputs are never read line by line.  Lines and groups
+of lines are split by bytes.split(), which runs in C and is much faster than slicing
+memoryviews in a Python loop, even though it copies each piece.  The rows of a grid all
+have the same width, so grid_rows() slices them at a fixed stride as zero-copy
+memoryviews.  Note that int() accepts bytes but not a memoryview.
+"""
+
+import mmap
+import os
+import sys
+from stat import S_ISREG
+
+# How many bytes of the input iter_groups() splits at a time.
+CHUNK_SIZE = 1 << 20
+
+# ----------------------------------------------------------------------------------------
+def read(path=None):
+    """
+    Return the challenge input in the file at path, or on stdin.
+
+    A file is memory-mapped, and so is stdin when it's redirected from a file, so that
+    the input is paged in as it's used.  Otherwise stdin (a pipe) is read whole.
+    """
+    if path is None:
+        fileno = sys.stdin.buffer.fileno()
+        stat = os.fstat(fileno)
+        if not S_ISREG(stat.st_mode) or os.lseek(fileno, 0, os.SEEK_CUR) != 0:
+            return sys.stdin.buffer.read()
+        return map_file(fileno, stat.st_size)
+    with open(path, 'rb') as fh:
+        # The mapping remains valid after the file is closed.
+        return map_file(fh.fileno(), os.fstat(fh.fileno()).st_size)
+
+def map_file(fileno, size):
+    "Return a read-only memory map of the open file, or b'' if it's empty."
+    # Empty files can't be mapped.
+    if size == 0:
+        return b''
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+# ----------------------------------------------------------------------------------------
+def to_bytes(data):
+    "Return the challenge input as bytes, encoding str and copying other buffers once."
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode()
+    return bytes(data)
+
+# ----------------------------------------------------------------------------------------
+def split_lines(data):
+    "Return a list of the lines of the input as bytes, without the line endings."
+    return to_bytes(data).splitlines()
+
+# ----------------------------------------------------------------------------------------
+def split_groups(data):
+    "Return a list of the groups of lines separated by blank lines, as bytes."
+    data = to_bytes(data)
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n')
+    # Extra blank lines leave empty groups (or lone newlines) behind.
+    return [group for group in data.split(b'\n\n') if group and not group.isspace()]
+
+def iter_groups(data, chunk_size=CHUNK_SIZE):
+    """
+    Yield the groups of lines separated by blank lines, as split_groups() returns them.
+
+    The input is split a chunk of about chunk_size bytes at a time, each ending at a blank
+    line, so the memory used doesn't grow with the size of the input.
+    """
+    # Bytes, bytearrays and memory maps are searched in place, but other buffers (such as
+    # memoryviews) have no find(), so they are copied once, and str is encoded.
+    if not isinstance(data, (bytes, bytearray, mmap.mmap)):
+        data = to_bytes(data)
+    start = 0
+    size = len(data)
+    while start < size:
+        end = size
+        next_start = size
+        if start + chunk_size < size:
+            # The first blank line after the chunk (with or without carriage returns).
+            for separator in (b'\n\n', b'\r\n\r\n'):
+                found = data.find(separator, start + chunk_size)
+                if 0 <= found < end:
+                    (end, next_start) = (found, found + len(separator))
+        yield from split_groups(data[start:end])
+        start = next_start
+
+# ----------------------------------------------------------------------------------------
+def grid_rows(data):
+    """
+    Return a memoryview of each row of an input made of fixed-width rows.
+
+    The width of the grid is the length of the first line, and every row is sliced at
+    the same stride from the start of the buffer, so no searching is required.  A memory
+    map is sliced in place, without being copied.
+    """
+    if isinstance(data, (str, memoryview)):
+        data = to_bytes(data)
+    view = memoryview(data)
+    width = data.find(b'\n')
+    if width < 0:
+        return [view] if len(view) > 0 else []
+    stride = width + 1
+    if width > 0 and view[width - 1] == ord('\r'):
+        width -= 1
+    # The final row might not end with a newline.
+    count = len(data) // stride
+    if len(data) % stride >= width > 0:
+        count += 1
+    return [view[row * stride:row * stride + width] for row in range(count)]
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Per-phase timing of a solve.
+
+Solutions mark their phases (parse, build, solve) with the phase() context manager:
+
+    with phase("parse"):
+        grid = read_input(data)
+
+When a solve is run through measure(), the time spent in each phase is recorded using the
+monotonic high-resolution clock.  Outside of measure(), phase() does nothing.
+
+With memory=True, measure() also traces allocations with tracemalloc, and records the peak
+traced memory of each phase and the largest allocation sites at the end of each phase.
+Tracing slows the solve down considerably, so the timings from such runs are inflated.
+
+The solutions also count the units of work their algorithms do (nodes expanded, cells
+stepped through, comparisons made) in ops, which is always on.  The innermost loops count
+in a local variable and add it to ops once per call, so the counting is nearly free:
+
+    ops["sand_steps"] += steps
+
+measure() records the counts of each solve, which say why a solve was slow (or fast)
+independently of the machine it ran on.
+"""
+
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+# The record of the solve currently being measured, or None.
+current = None
+# How many allocation sites to record at the end of each phase.
+TOP_SITES = 10
+# The units of work done by the solve currently being measured, by name.  (A Counter
+# would do, but adding to one is several times slower than adding to a defaultdict.)
+ops = defaultdict(int)
+
+# ----------------------------------------------------------------------------------------
+@contextmanager
+def phase(name):
+    "Add the time spent in the body of the with statement to the named phase."
+    record = current
+    if record is None:
+        yield
+        return
+    memory = record.get("memory")
+    if memory is not None:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = record["phases"]
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+        if memory is not None:
+            record_memory(memory, name, before)
+
+# ----------------------------------------------------------------------------------------
+def record_memory(memory, name, before):
+    """
+    Record the peak traced memory of a phase, and the largest allocation sites.
+
+    The peak is the most memory traced at any time during the phase, including whatever
+    earlier phases left behind.  Retained is how much more memory is traced at the end of
+    the phase than at the start.
+    """
+    (traced, peak) = tracemalloc.get_traced_memory()
+    # Ignore the allocations made by the instrumentation itself.
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, contextlib.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    sites = []
+    for stat in snapshot.statistics("lineno")[:TOP_SITES]:
+        frame = stat.traceback[0]
+        sites.append({"site": "%s:%d" % (frame.filename, frame.lineno),
+                      "bytes": stat.size, "blocks": stat.count})
+    previous = memory.get(name, {"peak": 0, "retained": 0})
+    memory[name] = {"peak": max(previous["peak"], peak),
+                    "retained": previous["retained"] + traced - before,
+                    "sites": sites}
+
+# ----------------------------------------------------------------------------------------
+def solve_day(solve):
+    "Return the day number of a solution's solve function, or None if it's unknown."
+    filename = getattr(sys.modules.get(solve.__module__), '__file__', None) or ''
+    match = re.fullmatch(r'day(\d+)', os.path.basename(os.path.dirname(filename)))
+    return int(match.group(1)) if match else None
+
+# ----------------------------------------------------------------------------------------
+def natural_key(name):
+    """
+    Return a key that sorts names with the numbers in them in numerical order.
+
+    Counts are named like inspections_monkey_7, so that inspections_monkey_100 sorts after
+    inspections_monkey_99 rather than after inspections_monkey_10.
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+# ----------------------------------------------------------------------------------------
+def measure(solve, part, data, input_name=None, memory=False):
+    """
+    Solve part of the challenge for the input data while timing each phase.
+
+    Return the answer and a record of the run, which can be serialized as JSON.  If memory
+    is True, the record also includes the memory used by each phase.
+    """
+    global current
+    record = {"day": solve_day(solve), "part": part, "input": input_name,
+              "input_bytes": len(data), "answer": None, "phases": {}, "total": None}
+    tracing = memory and not tracemalloc.is_tracing()
+    if memory:
+        record["memory"] = {}
+        if tracing:
+            tracemalloc.start()
+    previous = current
+    current = record
+    previous_ops = ops.copy()
+    ops.clear()
+    start = time.perf_counter()
+    try:
+        answer = solve(part, data)
+    finally:
+        record["total"] = time.perf_counter() - start
+        current = previous
+        record["ops"] = dict(sorted(ops.items(), key=lambda item: natural_key(item[0])))
+        # Leave the counts of any enclosing solve as they were, plus this one's.
+        for (name, count) in previous_ops.items():
+            ops[name] += count
+        if memory:
+            # Each phase resets the peak, so take the largest of the phases' peaks too.
+            peaks = [phase_memory["peak"] for phase_memory in record["memory"].values()]
+            record["peak_memory"] = max([tracemalloc.get_traced_memory()[1]] + peaks)
+        if tracing:
+            tracemalloc.stop()
+    record["answer"] = answer
+    return (answer, record)
+
+# ----------------------------------------------------------------------------------------
+def format_memory(record):
+    "Return a human readable report of the memory used by each phase as a list of lines."
+    report = ["Peak traced memory: %.2f MiB" % (record["peak_memory"] / 2**20)]
+    for (name, memory) in record["memory"].items():
+        report.append("  %-8s peak %10.2f MiB   retained %10.2f MiB" % (
+            name, memory["peak"] / 2**20, memory["retained"] / 2**20))
+    for (name, memory) in record["memory"].items():
+        report.append("Largest allocation sites at the end of %s:" % name)
+        for site in memory["sites"]:
+            report.append("  %10.2f MiB %10d blocks  %s" % (
+                site["bytes"] / 2**20, site["blocks"], site["site"]))
+    return report
+
+# ----------------------------------------------------------------------------------------
+def format_ops(record):
+    "Return a human readable report of the work done by a solve as a list of lines."
+    total = record["total"]
+    size = record["input_bytes"]
+    report = ["Operations in %.3fs on %d bytes of input:" % (total, size)]
+    for (name, count) in record["ops"].items():
+        rate = count / total if total else 0.0
+        per_byte = count / size if size else 0.0
+        report.append("  %-28s %14d  %14.0f/s  %12.3f/byte" % (
+            name, count, rate, per_byte))
+    if not record["ops"]:
+        report.append("  (this solution doesn't count its operations)")
+    return report
+
+# ----------------------------------------------------------------------------------------
+def write_record(path, record):
+    "Append a record as a line of JSON to the file at path, or to stderr if path is '-'."
+    line = json.dumps(record, default=str) + '\n'
+    if path == '-':
+        sys.stderr.write(line)
+    else:
+        with open(path, 'a') as fh:
+            fh.write(line)
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
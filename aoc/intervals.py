@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+A set of integers stored as sorted, disjoint, inclusive ranges.
+
+Ranges of millions of integers cost the same as a range of one.  Membership and range
+tests are binary searches, and so is finding the ranges that a new range touches, but
+adding a range replaces those ranges in the middle of the lists, which is linear in the
+number of ranges.  Adjacent ranges are merged, so (1, 3) and (4, 6) are stored as (1, 6).
+
+A range (lo, hi) with hi < lo is empty: adding it does nothing, the set covers it, and
+it overlaps nothing.
+"""
+
+from bisect import bisect_left, bisect_right
+
+# ----------------------------------------------------------------------------------------
+class IntervalSet(object):
+    "A set of integers stored as sorted, disjoint, inclusive (lo, hi) ranges."
+
+    def __init__(self, ranges=()):
+        # The starts and ends of the ranges, in parallel sorted lists.
+        self.starts = []
+        self.ends = []
+        # The number of integers in the set.
+        self.size = 0
+        for (lo, hi) in ranges:
+            self.add(lo, hi)
+
+    def add(self, lo, hi):
+        """
+        Add the integers from lo to hi inclusive to the set.
+
+        The ranges that lo..hi touches are found by binary search, but merging it with
+        them shifts the ranges after it, so adding is O(n) in the number of ranges.
+        """
+        if hi < lo:
+            return
+        # The ranges from first to last (exclusive) overlap or are adjacent to lo..hi.
+        first = bisect_left(self.ends, lo - 1)
+        last = bisect_right(self.starts, hi + 1)
+        if first < last:
+            lo = min(lo, self.starts[first])
+            hi = max(hi, self.ends[last - 1])
+            for n in range(first, last):
+                self.size -= self.ends[n] - self.starts[n] + 1
+        self.starts[first:last] = [lo]
+        self.ends[first:last] = [hi]
+        self.size += hi - lo + 1
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __contains__(self, value):
+        n = bisect_right(self.starts, value) - 1
+        return n >= 0 and value <= self.ends[n]
+
+    def __repr__(self):
+        return "IntervalSet(%s)" % list(self)
+
+    def covers(self, lo, hi):
+        "Return True if every integer from lo to hi inclusive is in the set."
+        if hi < lo:
+            return True
+        n = bisect_right(self.starts, lo) - 1
+        return n >= 0 and hi <= self.ends[n]
+
+    def overlaps(self, lo, hi):
+        "Return True if any integer from lo to hi inclusive is in the set."
+        if hi < lo:
+            return False
+        n = bisect_left(self.ends, lo)
+        return n < len(self.starts) and self.starts[n] <= hi
+
+    def issubset(self, other):
+        "Return True if every integer in the set is also in the other set."
+        return all(other.covers(lo, hi) for (lo, hi) in self)
+
+    def isdisjoint(self, other):
+        "Return True if the set has no integers in common with the other set."
+        return not any(other.overlaps(lo, hi) for (lo, hi) in self)
+
+    def gaps(self, lo, hi):
+        "Yield the (lo, hi) ranges between lo and hi inclusive that aren't in the set."
+        n = bisect_left(self.ends, lo)
+        while lo <= hi:
+            if n >= len(self.starts) or self.starts[n] > hi:
+                yield (lo, hi)
+                return
+            if self.starts[n] > lo:
+                yield (lo, self.starts[n] - 1)
+            lo = self.ends[n] + 1
+            n += 1
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmarks of the helpers called in the inner loops of the solutions.
+
+End to end timings hide which helper a solve spends its time in.  Each helper here is
+called in isolation on a sample of representative arguments taken from the day's puzzle
+input, and its cost is reported in nanoseconds per call.  The calls are repeated until a
+run takes at least --min-time seconds (which also warms up the caches), and the run is
+then repeated --repeat times, reporting the median, the fastest, and the spread.
+
+Alternative implementations of a helper are registered with @alternative, and are timed
+on the same arguments as the current implementation, after checking that they return
+the same results:
+
+    @alternative("day09.move_knot")
+    def move_knot_signs(head_pos, tail_pos):
+        ...
+
+Usage: python3 -m aoc.microbench [--helper=NAME ...] [--repeat=N] [--min-time=SECONDS]
+"""
+
+import random
+import statistics
+import sys
+import time
+from optparse import OptionParser
+
+from aoc import days, instrument
+
+# The most argument tuples sampled for each helper.
+SAMPLE = 1000
+
+# The function returning (helper, argument tuples) for each helper, by name.
+HELPERS = {}
+# The (name, function) of each alternative implementation of a helper, by helper name.
+ALTERNATIVES = {}
+
+def helper(name):
+    "Register the decorated function as the setup for benchmarking the named helper."
+    def register(setup):
+        HELPERS[name] = setup
+        return setup
+    return register
+
+def alternative(name):
+    "Register the decorated function as an alternative implementation of a helper."
+    def register(function):
+        ALTERNATIVES.setdefault(name, []).append((function.__name__, function))
+        return function
+    return register
+
+def read_input(day):
+    "Return the puzzle input for a day as bytes."
+    with open(days.input_path(day), 'rb') as fh:
+        return fh.read()
+
+def sample(rng, population):
+    "Return up to SAMPLE items chosen at random from population."
+    population = list(population)
+    if len(population) <= SAMPLE:
+        return population
+    return rng.sample(population, SAMPLE)
+
+# ----------------------------------------------------------------------------------------
+# The helpers
+# ----------------------------------------------------------------------------------------
+@helper("day08.look_direction")
+def setup_look_direction(rng):
+    day08 = days.load(8)
+    grid = day08.read_input(read_input(8))
+    return (day08.look_direction,
+            sample(rng, [(grid, index, offset) for index in grid.indexes()
+                         for offset in grid.offsets]))
+
+@helper("day09.move_knot")
+def setup_move_knot(rng):
+    # The tail is never more than two steps from the head in either direction.
+    heads = [(rng.randint(-100, 100), rng.randint(-100, 100)) for n in range(40)]
+    return (days.load(9).move_knot,
+            [(head, (head[0] + dx, head[1] + dy)) for head in heads
+             for dx in range(-2, 3) for dy in range(-2, 3)])
+
+@helper("day11.Monkey.operation")
+def setup_operation(rng):
+    day11 = days.load(11)
+    monkeys = list(day11.read_input(read_input(11)).values())
+    return (day11.Monkey.operation,
+            [(monkey, rng.randint(1, 10**6)) for monkey in monkeys for n in range(100)])
+
+@helper("day12.allowed")
+def setup_allowed(rng):
+    day12 = days.load(12)
+    elevations = day12.read_input(read_input(12))[2]
+    cells = elevations.cells
+    return (day12.allowed,
+            sample(rng, [(cells[index + offset], cells[index])
+                         for index in elevations.indexes()
+                         for offset in elevations.offsets]))
+
+@helper("day13.compare")
+def setup_compare(rng):
+    day13 = days.load(13)
+    packets = day13.read_input(read_input(13))
+    return (day13.compare, list(zip(packets[0::2], packets[1::2])))
+
+@helper("day14.move_sand")
+def setup_move_sand(rng):
+    day14 = days.load(14)
+    grid = day14.make_grid(*day14.read_input(read_input(14)))
+    # Drop grains from the source and from random cells of air.
+    starts = [grid.find(day14.SOURCE)] * 10
+    starts += sample(rng, [index for index in grid.indexes()
+                           if grid.cells[index] == day14.AIR])
+    return (day14.move_sand, [(grid, index) for index in starts])
+
+@helper("day15.consider_candidate")
+def setup_consider_candidate(rng):
+    day15 = days.load(15)
+    sensors = day15.read_input(read_input(15))
+    # The candidates are just outside the area blocked by each sensor, as in part two.
+    candidates = []
+    for (sx, sy, bx, by) in sensors:
+        distance = abs(sx-bx) + abs(sy-by) + 1
+        for n in range(SAMPLE // len(sensors)):
+            dx = rng.randint(-distance, distance)
+            dy = (distance - abs(dx)) * rng.choice([-1, 1])
+            candidates.append((sensors, sx + dx, sy + dy))
+    return (day15.consider_candidate, candidates)
+
+# ----------------------------------------------------------------------------------------
+# Alternative implementations
+# ----------------------------------------------------------------------------------------
+@alternative("day09.move_knot")
+def move_knot_signs(head_pos, tail_pos):
+    "Move the tail one step towards the head along the sign of each difference."
+    dx = head_pos[0] - tail_pos[0]
+    dy = head_pos[1] - tail_pos[1]
+    if -1 <= dx <= 1 and -1 <= dy <= 1:
+        return tail_pos
+    return (tail_pos[0] + (dx > 0) - (dx < 0), tail_pos[1] + (dy > 0) - (dy < 0))
+
+# ----------------------------------------------------------------------------------------
+def time_calls(function, args, number):
+    "Return the seconds taken to call function with each argument tuple number times."
+    start = time.perf_counter()
+    for n in range(number):
+        for arguments in args:
+            function(*arguments)
+    return time.perf_counter() - start
+
+def measure(function, args, repeat, min_time):
+    """
+    Return the nanoseconds per call of function on the argument tuples for each run.
+
+    The number of times to call function with each argument tuple doubles until a run
+    takes at least min_time seconds, and then repeat runs are timed.
+    """
+    number = 1
+    while time_calls(function, args, number) < min_time:
+        number *= 2
+    calls = number * len(args)
+    return [time_calls(function, args, number) / calls * 1e9 for n in range(repeat)]
+
+def check_alternative(function, alternative, args):
+    "Return the number of argument tuples that alternative gives a different result for."
+    return sum(1 for arguments in args if function(*arguments) != alternative(*arguments))
+
+# ----------------------------------------------------------------------------------------
+HEADER = ("Helper                     Implementation       ns/call       min  spread"
+          "  vs current")
+
+def format_result(name, implementation, timings, baseline, differs=0):
+    "Return a line of the report for the timings of one implementation of a helper."
+    median = statistics.median(timings)
+    spread = statistics.pstdev(timings) / median * 100 if median else 0.0
+    relative = "%.2fx" % (baseline / median) if baseline and median else "-"
+    if differs:
+        relative += "  (differs on %d arguments)" % differs
+    return "%-26s %-18s %9.1f %9.1f %6.1f%%  %s" % (
+        name, implementation, median, min(timings), spread, relative)
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return the command line parser for the microbenchmarks."
+    parser = OptionParser(usage="python3 -m aoc.microbench [options]")
+    parser.add_option("-H", "--helper", action="append", default=[],
+                      help="Benchmark only this helper (may be repeated).")
+    parser.add_option("--repeat", action="store", type="int", default=7,
+                      help="Time this many runs of each helper (default: 7).")
+    parser.add_option("--min-time", action="store", type="float", default=0.05,
+                      help="The shortest time for a run, in seconds (default: 0.05).")
+    parser.add_option("--seed", action="store", type="int", default=0,
+                      help="Seed for sampling the arguments (default: 0).")
+    parser.add_option("--timings", action="store", metavar="FILE",
+                      help="Append a JSON record of each implementation's timings to "
+                      "FILE.")
+    return parser
+
+def main():
+    parser = make_parser()
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+    for name in options.helper:
+        if name not in HELPERS:
+            parser.error("unknown helper %s (expected one of %s)" % (
+                name, ", ".join(sorted(HELPERS))))
+
+    print(HEADER)
+    for name in options.helper or sorted(HELPERS):
+        (function, args) = HELPERS[name](random.Random(options.seed))
+        implementations = [("current", function, 0)]
+        for (label, alternative) in ALTERNATIVES.get(name, []):
+            implementations.append(
+                (label, alternative, check_alternative(function, alternative, args)))
+        baseline = None
+        for (label, implementation, differs) in implementations:
+            timings = measure(implementation, args, options.repeat, options.min_time)
+            if baseline is None:
+                baseline = statistics.median(timings)
+            print(format_result(name, label, timings, baseline, differs))
+            sys.stdout.flush()
+            if options.timings:
+                instrument.write_record(options.timings, {
+                    "helper": name, "implementation": label, "calls": len(args),
+                    "ns_per_call": timings, "differs": differs})
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Profile a solve with cProfile and a stack sampler.
+
+cProfile's statistics are flat: a recursive function like day13's compare shows up
+as a single entry no matter how deep the recursion goes.  So while cProfile runs, the
+Python stack is also sampled on SIGPROF, and the samples are written in the collapsed
+stack format ("outer;middle;inner count") read by flamegraph tools.
+
+For a prefix of day08-part1, run() writes:
+
+    day08-part1.pstats     cProfile statistics, for pstats, snakeviz, etc.
+    day08-part1.txt        The statistics sorted by cumulative and internal time.
+    day08-part1.collapsed  The sampled stacks for flamegraph.pl, speedscope, etc.
+"""
+
+import cProfile
+import os
+import pstats
+import signal
+import sys
+from collections import Counter
+
+from aoc import days
+
+# How often the stack is sampled, in seconds of CPU time.
+SAMPLE_INTERVAL = 0.001
+# How many functions to list in each section of the statistics summary.
+SUMMARY_LENGTH = 40
+
+# ----------------------------------------------------------------------------------------
+def frame_name(frame):
+    "Return the name of a frame in a collapsed stack, e.g. day08/solution.py:part1."
+    filename = frame.f_code.co_filename
+    if filename.startswith(days.ROOT + os.sep):
+        filename = os.path.relpath(filename, days.ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return "%s:%s" % (filename, frame.f_code.co_name)
+
+# ----------------------------------------------------------------------------------------
+class StackSampler(object):
+    "Count the Python stacks observed each time the SIGPROF interval timer expires."
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = Counter()
+        # The frame name for each code object, so that sampling stays cheap.
+        self.names = {}
+        self.base = None
+        self.previous_handler = None
+
+    @staticmethod
+    def available():
+        "Return True if the platform supports sampling with SIGPROF."
+        return hasattr(signal, "SIGPROF") and hasattr(signal, "setitimer")
+
+    def sample(self, signum, frame):
+        "Record the stack from the interrupted frame up to (but not including) base."
+        names = []
+        while frame is not None and frame is not self.base:
+            name = self.names.get(frame.f_code)
+            if name is None:
+                name = self.names[frame.f_code] = frame_name(frame)
+            names.append(name)
+            frame = frame.f_back
+        # Ignore samples taken outside of the code being profiled.
+        if frame is self.base and names:
+            self.counts[';'.join(reversed(names))] += 1
+
+    def start(self, base):
+        "Start sampling the stacks beneath the frame base."
+        self.base = base
+        self.previous_handler = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        "Stop sampling."
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler)
+
+    def write(self, fh):
+        "Write the samples in collapsed stack format."
+        for (stack, count) in sorted(self.counts.items()):
+            fh.write("%s %d\n" % (stack, count))
+
+# ----------------------------------------------------------------------------------------
+def write_summary(profiler, path):
+    "Write the profile statistics sorted by cumulative time and by internal time."
+    with open(path, 'w') as fh:
+        stats = pstats.Stats(profiler, stream=fh)
+        stats.strip_dirs()
+        for order in ("cumulative", "tottime"):
+            fh.write("Sorted by %s time:\n" % order)
+            stats.sort_stats(order).print_stats(SUMMARY_LENGTH)
+
+# ----------------------------------------------------------------------------------------
+def run(prefix, func, *args):
+    "Call func(*args) while profiling it, write the profile files, and return the result."
+    profiler = cProfile.Profile()
+    sampler = StackSampler() if StackSampler.available() else None
+    if sampler is not None:
+        sampler.start(sys._getframe())
+    profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+
+    profiler.dump_stats(prefix + ".pstats")
+    write_summary(profiler, prefix + ".txt")
+    if sampler is not None:
+        with open(prefix + ".collapsed", 'w') as fh:
+            sampler.write(fh)
+    else:
+        print("Stack sampling isn't supported here, so %s.collapsed wasn't written." % (
+            prefix), file=sys.stderr)
+    return result
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Solve every day and part in parallel on a process pool, and report the answers.
+
+Usage: python3 -m aoc.runner [--jobs=N] [--day=N ...] [--part=N] [--input=NAME]
+
+With --part=both, each day is a single job that parses its input once and solves both
+parts from it.
+
+Answers are saved in an on-disk cache (see aoc.cache), so a job whose input and solution
+haven't changed is reported from the cache without being solved again.  Pass --no-cache
+to solve every job.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+from optparse import OptionParser
+
+from aoc import cache, days, inputs, instrument
+
+# ----------------------------------------------------------------------------------------
+def make_jobs(day_list, parts, input_name='input'):
+    "Return a (day, part, path) job for each day and part that has the named input."
+    jobs = []
+    for day in day_list:
+        path = days.input_path(day, input_name)
+        if not os.path.isfile(path):
+            continue
+        for part in parts:
+            jobs.append((day, part, path))
+    return jobs
+
+# ----------------------------------------------------------------------------------------
+def run_job(job, memory=False):
+    """
+    Solve one (day, part, path) job and return a result dictionary.
+
+    If memory is True, the result includes the memory used by each phase.  Exceptions are
+    reported in the result instead of being raised, so that one failing day doesn't
+    prevent the other days from being reported.
+    """
+    (day, part, path) = job
+    result = {"day": day, "part": part, "input": path,
+              "answer": None, "error": None, "seconds": None, "phases": None}
+    try:
+        module = days.load(day)
+        data = inputs.read(path)
+        (answer, record) = instrument.measure(module.solve, part, data, path, memory)
+        result.update(record)
+        result["seconds"] = record["total"]
+    except Exception as e:
+        result["error"] = "%s: %s" % (type(e).__name__, e)
+    return result
+
+# ----------------------------------------------------------------------------------------
+def lookup_jobs(answer_cache, jobs):
+    """
+    Look up each (day, part, path) job in the answer cache.
+
+    Return the results of the jobs that were found, and a dictionary mapping each job that
+    wasn't found to its cache key.
+    """
+    hits = []
+    misses = {}
+    solution_hashes = {}
+    for job in jobs:
+        (day, part, path) = job
+        if day not in solution_hashes:
+            solution_hashes[day] = cache.source_hash(day)
+        key = cache.make_key(day, part, inputs.read(path), solution_hashes[day])
+        entry = answer_cache.get(key)
+        if entry is None:
+            misses[job] = key
+            continue
+        result = {"day": day, "part": part, "input": path, "error": None, "cached": True}
+        result.update(entry)
+        hits.append(result)
+    return (hits, misses)
+
+# ----------------------------------------------------------------------------------------
+def run_jobs(jobs, processes=None, memory=False):
+    "Run the jobs on a pool of processes, yielding each result as soon as it's complete."
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(partial(run_job, memory=memory), jobs,
+                                          chunksize=1):
+            yield result
+
+# ----------------------------------------------------------------------------------------
+def format_table(results):
+    """
+    Return a table of the results as a list of lines, ordered by day and part.
+
+    The table includes the peak traced memory of each job when the results record it.
+    """
+    memory = any("peak_memory" in result for result in results)
+    table = ["Day Part    Seconds %s Answer" % ("  Peak(MiB) " if memory else "")]
+    cached = False
+    indent = 21 + (12 if memory else 0)
+    for result in sorted(results, key=lambda r: (r["day"], r["part"], r["input"])):
+        if result["error"] is not None:
+            answer = "ERROR %s" % result["error"]
+            seconds = "-"
+        elif isinstance(result["answer"], tuple):
+            # Both parts were solved together, so report one answer per line.
+            answer = '\n'.join(str(a) for a in result["answer"])
+            seconds = "%.3f" % result["seconds"]
+        else:
+            answer = str(result["answer"])
+            seconds = "%.3f" % result["seconds"]
+        if result.get("cached"):
+            seconds += "*"
+            cached = True
+        peak = ""
+        if memory:
+            peak = "%11s " % ("-" if "peak_memory" not in result
+                              else "%.2f" % (result["peak_memory"] / 2**20))
+        # Multi-line answers (like the day 10 screen) continue under the answer column.
+        answer_lines = answer.split('\n')
+        table.append("%3d %4s %10s %s %s" % (
+            result["day"], result["part"], seconds, peak, answer_lines[0]))
+        for line in answer_lines[1:]:
+            table.append("%s%s" % (' ' * indent, line))
+    if cached:
+        table.append("* The answer and time were reported from the cache.")
+    return table
+
+# ----------------------------------------------------------------------------------------
+def make_parser():
+    "Return the command line parser for the runner."
+    parser = OptionParser(usage="python3 -m aoc.runner [options]")
+    parser.add_option("-j", "--jobs", action="store", type="int",
+                      help="Number of worker processes (default: number of cores).")
+    parser.add_option("-D", "--day", action="append", type="int", default=[],
+                      help="Solve only this day (may be repeated).")
+    parser.add_option("-p", "--part", action="store",
+                      help="Solve only this part (1, 2 or both).")
+    parser.add_option("-i", "--input", action="store", default="input",
+                      help="Name of the input file in each day's directory.")
+    parser.add_option("--timings", action="store", metavar="FILE",
+                      help="Append a JSON record of each job's phase timings to FILE.")
+    parser.add_option("--memory", action="store_true",
+                      help="Trace the peak memory used by each job (slows solving).")
+    parser.add_option("--no-cache", action="store_false", dest="cache", default=True,
+                      help="Solve every job instead of reporting cached answers.")
+    return parser
+
+def main():
+    parser = make_parser()
+    (options, args) = parser.parse_args()
+    if len(args) > 0:
+        parser.error("no arguments are allowed")
+
+    if options.part not in [None, "1", "2", "both"]:
+        parser.error("please specify --part=1, --part=2 or --part=both")
+
+    day_list = options.day or days.find_days()
+    if options.part is None:
+        parts = [1, 2]
+    elif options.part == "both":
+        parts = ["both"]
+    else:
+        parts = [int(options.part)]
+    jobs = make_jobs(day_list, parts, options.input)
+
+    start = time.perf_counter()
+    # Tracing memory requires solving, so the cache isn't used with --memory.
+    answer_cache = None
+    if options.cache and not options.memory:
+        answer_cache = cache.AnswerCache()
+        (results, misses) = lookup_jobs(answer_cache, jobs)
+        jobs = list(misses)
+    else:
+        results = []
+    for result in run_jobs(jobs, options.jobs, options.memory):
+        results.append(result)
+        if answer_cache is not None and result["error"] is None:
+            job = (result["day"], result["part"], result["input"])
+            answer_cache.put(misses[job], result)
+    wall = time.perf_counter() - start
+
+    for line in format_table(results):
+        print(line)
+    if options.timings:
+        for result in results:
+            instrument.write_record(options.timings, result)
+    total = sum(r["seconds"] for r in results
+                if r["seconds"] is not None and not r.get("cached"))
+    hits = sum(1 for r in results if r.get("cached"))
+    print("Solved %d jobs (%d from the cache) in %.3fs wall time (%.3fs of solving)." % (
+        len(results), hits, wall, total))
+    if any(r["error"] is not None for r in results):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Structured trace events, sampled and written as lines of JSON.
+
+Debugging output is free-form and unconditional, so on a large input it floods stdout
+and slows the solve down by orders of magnitude.  Trace events are instead written to
+their own file, one JSON object per line:
+
+    {"seq": 2, "event": "knot_move", "direction": "R", "head": [2, 0], "tail": [1, 0]}
+
+Each event type can be sampled at its own rate (a rate of 0.01 keeps one event in a
+hundred), and a ring buffer can keep only the last N sampled events, which are written
+when tracing stops.  Solutions emit events in their slow paths like this:
+
+    if trace.tracer:
+        trace.emit("sand_settled", x=x, y=y, grains=grains)
+
+so that nothing is computed for an event unless tracing is on.
+"""
+
+import json
+from collections import Counter, deque
+
+# The tracer of the current process, or None when tracing is off.
+tracer = None
+
+# ----------------------------------------------------------------------------------------
+class Tracer(object):
+    "Sample events by type and write them (or the last ring of them) as JSON lines."
+
+    def __init__(self, fh, rates=None, ring=None):
+        self.fh = fh
+        # The sampling rate of each event type, with "*" as the default for the others.
+        self.rates = dict(rates or {})
+        self.default_rate = self.rates.pop("*", 1.0)
+        self.ring = deque(maxlen=ring) if ring else None
+        # How many events of each type were emitted, and how many of them were kept.
+        self.emitted = Counter()
+        self.kept = Counter()
+        self.seq = 0
+
+    def event(self, kind, fields):
+        "Record an event of type kind with the given fields, if it's sampled."
+        self.seq += 1
+        count = self.emitted[kind] = self.emitted[kind] + 1
+        rate = self.rates.get(kind, self.default_rate)
+        # Keep every (1/rate)th event, so that sampling is evenly spaced and repeatable.
+        if rate < 1.0 and int(count * rate) == int((count - 1) * rate):
+            return
+        self.kept[kind] += 1
+        record = {"seq": self.seq, "event": kind}
+        record.update(fields)
+        if self.ring is not None:
+            self.ring.append(record)
+        else:
+            self.fh.write(json.dumps(record, default=str) + '\n')
+
+    def close(self):
+        "Write the ring buffer (if any) and a summary of the events, and close the file."
+        if self.ring is not None:
+            for record in self.ring:
+                self.fh.write(json.dumps(record, default=str) + '\n')
+        summary = {"seq": self.seq, "event": "trace_summary",
+                   "emitted": dict(self.emitted), "kept": dict(self.kept)}
+        self.fh.write(json.dumps(summary) + '\n')
+        self.fh.close()
+
+# ----------------------------------------------------------------------------------------
+def parse_rates(specs):
+    "Return the sampling rates from a list of TYPE=RATE strings (TYPE may be *)."
+    rates = {}
+    for spec in specs:
+        (kind, sep, rate) = spec.partition('=')
+        if not sep:
+            raise ValueError("expected TYPE=RATE, not %r" % spec)
+        rate = float(rate)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError("the rate for %s must be between 0 and 1" % kind)
+        rates[kind] = rate
+    return rates
+
+def start(path, rates=None, ring=None):
+    "Start tracing to the file at path."
+    global tracer
+    tracer = Tracer(open(path, 'w'), rates, ring)
+
+def stop():
+    "Stop tracing, and finish writing the trace."
+    global tracer
+    if tracer is not None:
+        tracer.close()
+        tracer = None
+
+def emit(kind, **fields):
+    "Record an event of type kind with the given fields, if tracing is on."
+    if tracer is not None:
+        tracer.event(kind, fields)
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
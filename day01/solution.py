@@ -2,60 +2,204 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 1."""
 
+import os
 import sys
-from optparse import OptionParser
+import time
+from heapq import heappush, heapreplace
+from optparse import OptionValueError
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import debug, main, make_parser, options
+from aoc.inputs import CHUNK_SIZE, iter_groups
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
 # ========================================================================================
 
+# How many of the largest sums each part adds up, unless --top says otherwise.
+PART_TOP = {1: 1, 2: 3}
+
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
-def read_input():
-    "Read the challenge input."
-    sums = []
-    s = 0
-    for line in sys.stdin:
-        line = line.rstrip()
-        if line == '':
-            sums.append(s)
-            s = 0
-        else:
-            s += int(line)
-
-    sums.append(s)
-    return sums
+class TopK(object):
+    """
+    The k largest of a stream of values.
+
+    The values are kept in a min-heap of at most k items, so a value that is no larger
+    than the smallest of them is rejected with a single comparison, and any other costs
+    O(log k) to add.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def add(self, value):
+        "Add a value, and return True if it's now one of the k largest."
+        heap = self.heap
+        if len(heap) < self.k:
+            heappush(heap, value)
+            return True
+        if value > heap[0]:
+            heapreplace(heap, value)
+            return True
+        return False
+
+    def update(self, values):
+        "Add each of the values."
+        (heap, k) = (self.heap, self.k)
+        for value in values:
+            if len(heap) < k:
+                heappush(heap, value)
+            elif value > heap[0]:
+                heapreplace(heap, value)
+
+    def largest(self):
+        "Return the k largest values (or all of them, if there are fewer), largest first."
+        return sorted(self.heap, reverse=True)
+
+def top_count(part):
+    "Return how many of the largest sums to add up for a part."
+    return getattr(options, "top", None) or PART_TOP[part]
+
+def store_top(option, opt_str, value, parser):
+    "Store the value of --top, which must be positive."
+    if value < 1:
+        raise OptionValueError("%s must be at least 1" % opt_str)
+    parser.values.top = value
+
+def read_input(data):
+    "Yield the sum of the calories carried by each elf."
+    # Each elf's calories are a group of lines, and int() accepts the bytes of each line.
+    for group in iter_groups(data):
+        yield sum(map(int, group.split()))
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the largest sums needed by either part."
+    with phase("parse"):
+        top = TopK(max(top_count(part) for part in PART_TOP))
+        top.update(read_input(data))
+        return top
+
+def solve_prepared(part, top):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        largest = top.largest()[:top_count(part)]
+        debug(largest)
+        return sum(largest)
+
+# ----------------------------------------------------------------------------------------
+# Following an input as it grows
+# ----------------------------------------------------------------------------------------
+class Follower(object):
+    """
+    The largest sums of an input that is only ever appended to.
+
+    Only the bytes appended since the last feed() are parsed.  Each group is added to the
+    heap once the blank line after it arrives, and until then only its complete lines are
+    counted, as a provisional sum that is kept out of the heap.  A last line without its
+    newline may still be being written, so it isn't counted until the newline arrives:
+    b"100\n200" answers 100 where solve() answers 300.
+    """
+
+    def __init__(self, k):
+        self.top = TopK(k)
+        # The bytes after the last blank line: a group that is still being written.
+        self.pending = b''
+
+    def feed(self, data):
+        "Parse the bytes appended to the input."
+        text = self.pending + data
+        # Only the appended bytes (and the end of the pending ones) can hold a blank line.
+        start = max(len(self.pending) - 2, 0)
+        cut = -1
+        for separator in (b'\n\n', b'\n\r\n'):
+            found = text.rfind(separator, start)
+            if found >= 0 and found + len(separator) > cut:
+                cut = found + len(separator)
+        if cut < 0:
+            self.pending = text
+            return
+        self.top.update(read_input(text[:cut]))
+        self.pending = text[cut:]
+
+    def answer(self, part):
+        "Return the answer to a part for the input so far."
+        if part == "both":
+            return (self.answer(1), self.answer(2))
+        values = list(self.top.heap)
+        # The complete lines of the group still being written.
+        lines = self.pending[:self.pending.rfind(b'\n') + 1].split()
+        if lines:
+            values.append(sum(map(int, lines)))
+        return sum(sorted(values, reverse=True)[:top_count(part)])
+
+def follow(part, path):
+    """
+    Print the answer for the input at path, and print it again each time it changes.
+
+    The file is polled every --follow-interval seconds for appended bytes, and is read
+    again from the start if it's truncated.  Interrupting the program stops following.
+    """
+    k = max(top_count(each_part) for each_part in PART_TOP)
+    interval = getattr(options, "follow_interval", 1.0)
+    follower = Follower(k)
+    previous = None
+    try:
+        with open(path, 'rb') as fh:
+            while True:
+                if os.fstat(fh.fileno()).st_size < fh.tell():
+                    fh.seek(0)
+                    follower = Follower(k)
+                    previous = None
+                appended = False
+                for data in iter(lambda: fh.read(CHUNK_SIZE), b''):
+                    follower.feed(data)
+                    appended = True
+                if appended:
+                    answer = follower.answer(part)
+                    if answer != previous:
+                        # Print each answer on its own line, as main() does.
+                        for part_answer in (answer if part == "both" else (answer,)):
+                            print(part_answer)
+                        sys.stdout.flush()
+                        previous = answer
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    sums = read_input()
-    if options.part == 1:
-        debug(sums)
-        print(max(sums))
-    else:
-        debug(sorted(sums)[-3:])
-        print(sum(sorted(sums)[-3:]))
+    parser = make_parser()
+    parser.add_option("--top", action="callback", callback=store_top, type="int",
+                      metavar="N",
+                      help="Add up the N largest sums in either part (part one is N=1, "
+                      "and part two is N=3).")
+    parser.add_option("--follow", action="store_true",
+                      help="Keep reading the input as it's appended to, and print the "
+                      "answer each time it changes (requires --input).")
+    parser.add_option("--follow-interval", action="store", type="float", default=1.0,
+                      metavar="SECONDS",
+                      help="How often to check for appended input (default: 1).")
+    main(solve, parser, follow)
 
 # Part one solution for test-input1 is: 24000
 # Part two solution for test-input1 is: 45000
@@ -2,29 +2,20 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 2."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import lines, main
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
@@ -74,12 +65,10 @@ def round_score(opponent, me):
     return 6
 
 # ----------------------------------------------------------------------------------------
-def read_input(part):
-    "Read the challenge input and solve it."
+def total_score(rounds, part):
+    "Return my total score for playing every round using the strategy guide for part."
     score = 0
-    for line in sys.stdin:
-        line = line.rstrip()
-        (opponent, strategy) = line.split()
+    for (opponent, strategy) in rounds:
         # Choose my play based on which strategy guide we're uding (part1 or part2).
         if part == 1:
             me = part1(strategy)
@@ -87,11 +76,38 @@ def read_input(part):
             me = part2(opponent, strategy)
         # Increment my score by the results for this round.
         score += (play_score[me] + round_score(opponent, me))
-    print(score)
+    return score
+
+# ----------------------------------------------------------------------------------------
+def read_input(data):
+    "Read the challenge input as a list of (opponent, strategy) rounds."
+    rounds = []
+    for line in lines(data):
+        (opponent, strategy) = line.split()
+        rounds.append((opponent, strategy))
+    return rounds
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
 
+def solve_prepared(part, rounds):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        return total_score(rounds, part)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    read_input(options.part)
+    main(solve)
 
 # Part one solution for test-input1 is: 15
 # Part two solution for test-input1 is: 12
@@ -2,29 +2,20 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 3."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import debugf, lines, main
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
@@ -33,10 +24,9 @@ def debug(*args, **kwargs):
 # ----------------------------------------------------------------------------------------
 # Part One
 # ----------------------------------------------------------------------------------------
-def part1():
+def part1(rucksacks):
     total = 0
-    for line in sys.stdin:
-        line = line.rstrip()
+    for line in rucksacks:
         # Split into two compartments.
         compartment1 = set(line[:int(len(line)/2)])
         compartment2 = set(line[int(len(line)/2):])
@@ -47,17 +37,16 @@ def part1():
         # Add to the total.
         total += priority
         # Report the result when debugging.
-        debug("shared=%s priority=%s total=%s" % (shared, priority, total))
-    print(total)
+        debugf("shared=%s priority=%s total=%s", shared, priority, total)
+    return total
 
 # ----------------------------------------------------------------------------------------
 # Part Two
 # ----------------------------------------------------------------------------------------
-def part2():
+def part2(rucksacks):
     total = 0
     group = []
-    for line in sys.stdin:
-        line = line.rstrip()
+    for line in rucksacks:
         group.append(line)
         # Once we've read three lines, we have a group of elves.
         if len(group) == 3:
@@ -72,10 +61,10 @@ def part2():
             # Add to the total.
             total += priority
             # Report the result when debugging.
-            debug("badge=%s priority=%s total=%s" % (badge, priority, total))
+            debugf("badge=%s priority=%s total=%s", badge, priority, total)
             # Clear the group list for the next group.
             group = []
-    print(total)
+    return total
 
 # ----------------------------------------------------------------------------------------
 # Shared
@@ -83,11 +72,35 @@ def part2():
 # The priorities for each letter.
 priorities = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+# ----------------------------------------------------------------------------------------
+def read_input(data):
+    "Read the challenge input as a list of rucksacks."
+    return list(lines(data))
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
+
+def solve_prepared(part, rucksacks):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        if part == 1:
+            return part1(rucksacks)
+        else:
+            return part2(rucksacks)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
 if __name__ == '__main__':
-    if options.part == 1:
-        part1()
-    else:
-        part2()
+    main(solve)
 
 # Part one solution for test-input1 is: 157
 # Part two solution for test-input1 is: 70
@@ -2,29 +2,22 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 4."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.extract import each_record, integer_records
+from aoc.infra import debugf, main
+from aoc.instrument import phase
+from aoc.intervals import IntervalSet
 
 # ========================================================================================
 # Solution
@@ -44,35 +37,58 @@ def part1(elf1, elf2):
 # ----------------------------------------------------------------------------------------
 def part2(elf1, elf2):
     "Return one if the two elves overlap, otherwise zero."
-    if len(elf1.intersection(elf2)) > 0:
+    if not elf1.isdisjoint(elf2):
         return 1
     return 0
 
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
-def read_input(part):
-    "Read the challenge input and solve it."
-    count = 0
-    for line in sys.stdin:
-        line = line.rstrip()
-        # Split line into two elves.
-        (elf1, elf2) = line.split(',')
-        # Convert each elf into a min and max for the range.
-        (elf1min, elf1max) = elf1.split('-')
-        (elf2min, elf2max) = elf2.split('-')
+def read_input(data):
+    "Read the challenge input as a list of pairs of sets of sections."
+    pairs = []
+    # Each line is the min and max of the range of each of two elves.
+    ranges = integer_records(data, 4, signed=False)
+    for (elf1min, elf1max, elf2min, elf2max) in each_record(ranges, 4):
         # Make sets for each elf.
-        elf1set = set(range(int(elf1min), int(elf1max) + 1))
-        elf2set = set(range(int(elf2min), int(elf2max) + 1))
+        elf1set = IntervalSet([(elf1min, elf1max)])
+        elf2set = IntervalSet([(elf2min, elf2max)])
+        pairs.append((elf1set, elf2set))
+    return pairs
+
+# ----------------------------------------------------------------------------------------
+def count_pairs(pairs, part):
+    "Count the pairs of elves that match the rule for part."
+    count = 0
+    for (elf1set, elf2set) in pairs:
         if part == 1:
             count += part1(elf1set, elf2set)
         else:
             count += part2(elf1set, elf2set)
-        debug("count=%s elf1=%s elf2=%s" % (count, elf1set, elf2set))
-    print(count)
+        debugf("count=%s elf1=%s elf2=%s", count, elf1set, elf2set)
+    return count
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
+
+def solve_prepared(part, pairs):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        return count_pairs(pairs, part)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    read_input(options.part)
+    main(solve)
 
 # Part one solution for test-input1 is: 2
 # Part two solution for test-input1 is: 4
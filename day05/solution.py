@@ -2,29 +2,22 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 5."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.extract import each_record, integer_records
+from aoc.infra import debug, debugf, lines, main, options
+from aoc.inputs import split_groups
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
@@ -53,33 +46,24 @@ def move_crates_part2(stacks, count, from_stack, to_stack):
 # ----------------------------------------------------------------------------------------
 def debug_stacks(stacks):
     "Print the stacks for debugging.  Stack top is on right."
+    if not options.debug:
+        return
     for n, stack in enumerate(stacks[1:]):
         debug("  ", n + 1, ''.join(stack))
 
 # ----------------------------------------------------------------------------------------
-def read_input(part):
-    "Read the challenge input and solve it."
+def read_input(data):
+    "Read the challenge input as the initial stacks and a list of moves."
     # Our stacks. The zero element is unused.
     stacks = []
-    for line in sys.stdin:
-        line = line.rstrip()
-        if line.startswith("move"):
-            (move, count, from_word, from_stack, to_word, to_stack) = line.split()
-            count = int(count)
-            from_stack = int(from_stack)
-            to_stack = int(to_stack)
-            print("Move count=%d from=%d to=%d" % (count, from_stack, to_stack))
-            # Move the crates, using the strategy from part 1 or part 2.
-            if part == 1:
-                move_crates_part1(stacks, count, from_stack, to_stack)
-            else:
-                move_crates_part2(stacks, count, from_stack, to_stack)
-            # Report the stacks after the move.
-            debug_stacks(stacks)
-        elif line == '':
-            # Report the stacks after initialization.
-            debug_stacks(stacks)
-        else:
+    # The drawing of the stacks is separated from the moves by a blank line.
+    groups = split_groups(data)
+    drawing = groups[0] if groups else b''
+    # Each move is the count, from stack and to stack.
+    moves = integer_records(b''.join(groups[1:]), 3, signed=False)
+    moves = list(each_record(moves, 3))
+    for line in lines(drawing):
+        if line != '':
             # Initialize the stacks (first lines in input)
             pos = 1
             stack = 1
@@ -97,15 +81,52 @@ def read_input(part):
                 # Advance to next location in line, and next stack.
                 pos += 4
                 stack += 1
+    # Report the stacks after initialization.
+    debug_stacks(stacks)
+    return (stacks, moves)
+
+# ----------------------------------------------------------------------------------------
+def rearrange(stacks, moves, part):
+    "Move the crates on a copy of the stacks and return the crates on top of each stack."
+    stacks = [list(stack) for stack in stacks]
+    for (count, from_stack, to_stack) in moves:
+        debugf("Move count=%d from=%d to=%d", count, from_stack, to_stack)
+        # Move the crates, using the strategy from part 1 or part 2.
+        if part == 1:
+            move_crates_part1(stacks, count, from_stack, to_stack)
+        else:
+            move_crates_part2(stacks, count, from_stack, to_stack)
+        # Report the stacks after the move.
+        debug_stacks(stacks)
 
     answer = []
     for stack in stacks[1:]:
         if len(stack) > 0:
             answer.append(stack[-1])
-    print(''.join(answer))
+    return ''.join(answer)
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
+
+def solve_prepared(part, state):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    (stacks, moves) = state
+    with phase("solve"):
+        return rearrange(stacks, moves, part)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    read_input(options.part)
+    main(solve)
 
 # Part one solution for test-input1 is: CMZ
 # Part two solution for test-input1 is: MCD
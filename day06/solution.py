@@ -2,29 +2,20 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 6."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import debugf, lines, main, options
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
@@ -41,11 +32,16 @@ def debug(*args, **kwargs):
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
-def read_input(size):
-    "Read the challenge input and solve it."
+def read_input(data):
+    "Read the challenge input as a list of datastreams."
     # Input is only one line, but the test-input was several.  Each line is a separate test.
-    for line in sys.stdin:
-        line = line.rstrip()
+    return list(lines(data))
+
+# ----------------------------------------------------------------------------------------
+def find_markers(streams, size):
+    "Return the position of the first marker of size unique characters in each stream."
+    answers = []
+    for line in streams:
         # The buffer containing size most recent characters.
         buff = []
         # The current position in the message.
@@ -57,20 +53,44 @@ def read_input(size):
             # If the buffer is too big (>size characters), remove the oldest character.
             if len(buff) > size:
                 buff.pop(0)
-            debug("buff=%4s set=%4s" % (''.join(buff), ''.join(set(buff))))
+            if options.debug:
+                debugf("buff=%4s set=%4s", ''.join(buff), ''.join(set(buff)))
             # If we have a full buffer and there are size unique characters in the buffer,
             # then this is our solution.
             if len(buff) == size and len(set(buff)) == size:
-                print(pos)
+                answers.append(pos)
                 break
             # Advance to the next character.
             pos += 1
+    # Report multiple tests the way they're recorded below, separated by commas.
+    if len(answers) == 1:
+        return answers[0]
+    return ','.join(str(answer) for answer in answers)
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
+
+def solve_prepared(part, streams):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        if part == 1:
+            return find_markers(streams, 4)
+        else:
+            return find_markers(streams, 14)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    if options.part == 1:
-        read_input(4)
-    else:
-        read_input(14)
+    main(solve)
 
 # Part one solution for test-input1 is: 7,5,6,10,11
 # Part two solution for test-input1 is: 19,23,23,29,26
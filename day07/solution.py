@@ -2,29 +2,20 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 7."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import debugf, lines, main, options
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
@@ -36,7 +27,7 @@ def debug(*args, **kwargs):
 def part1(fs):
     "Report the total size of all directories < 100000 bytes in size."
     total = visit_filesystem1(fs)
-    print(total)
+    return total
 
 # ----------------------------------------------------------------------------------------
 def visit_filesystem1(fs):
@@ -65,7 +56,7 @@ def part2(fs):
     space_to_be_deleted = space_required - space_free
     # Calculate how much disk space is freed by deleting the best size directory.
     freed = visit_filesystem2(fs, space_to_be_deleted, space_required)
-    print(freed)
+    return freed
 
 # ----------------------------------------------------------------------------------------
 def visit_filesystem2(fs, required, best):
@@ -112,20 +103,21 @@ def compute_size(fs):
 # ----------------------------------------------------------------------------------------
 def debug_filesystem(fs, indent=''):
     "Display the contents of the filesystem."
+    if not options.debug:
+        return
     for f in sorted(fs):
         if isinstance(fs[f], dict):
-            debug('%s- %s (dir)' % (indent, f))
+            debugf('%s- %s (dir)', indent, f)
             debug_filesystem(fs[f], indent + '  ')
         else:
-            debug('%s  - %s (file, size=%s)' % (indent, f, fs[f]))
+            debugf('%s  - %s (file, size=%s)', indent, f, fs[f])
 
 # ----------------------------------------------------------------------------------------
-def read_input():
+def read_input(data):
     "Read the challenge input."
     fs = {"/": {} }
     pwd = ["/"]
-    for line in sys.stdin:
-        line = line.rstrip()
+    for line in lines(data):
         if line.startswith('$ '):
             if line.startswith('$ ls'):
                 # Lines will be handled in the else case.
@@ -155,14 +147,34 @@ def read_input():
                     print("unexpected duplicate: %s" % line, file=sys.stderr)
     return fs
 
-if __name__ == '__main__':
-    fs = read_input()
-    compute_size(fs)
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        fs = read_input(data)
+    with phase("build"):
+        compute_size(fs)
     debug_filesystem(fs)
-    if options.part == 1:
-        part1(fs)
-    else:
-        part2(fs)
+    return fs
+
+def solve_prepared(part, fs):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        if part == 1:
+            return part1(fs)
+        else:
+            return part2(fs)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
+if __name__ == '__main__':
+    main(solve)
 
 # Part one solution for test-input1 is: 95437
 # Part two solution for test-input1 is: 24933642
@@ -2,38 +2,126 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 8."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.engines import select
+from aoc.infra import debug, debugf, lines, main, options
+from aoc.grid import Grid
+from aoc.inputs import grid_rows
+from aoc.instrument import ops, phase
 
 # ========================================================================================
 # Solution
 # ========================================================================================
 
+# The value of the cells in the border around the grid of trees, which is lower than any
+# tree.
+EDGE = 0
+
+# The engines for looking at the trees: a bordered Grid of bytes walked by index, or the
+# original lists of characters walked recursively by (row, column).
+ENGINES = ("grid", "rows")
+REFERENCE_ENGINE = "rows"
+
 # ----------------------------------------------------------------------------------------
 # Part One
 # ----------------------------------------------------------------------------------------
-def look_direction(grid, row, column, row_direction, column_direction, height = None):
+def look_direction(grid, index, offset):
+    """
+    Return true if the tree is visible from the edge looking in a certain direction.
+    """
+    cells = grid.cells
+    height = cells[index]
+    start = index
+    # Keep looking in the same direction until we reach the edge of the grid.
+    index += offset
+    while cells[index] != EDGE:
+        # If the neighboring tree blocks the view from the edge of the grid, this tree is
+        # not visible.
+        if cells[index] >= height:
+            ops["look_steps"] += (index - start) // offset
+            return False
+        index += offset
+    ops["look_steps"] += (index - start) // offset
+    return True
+
+# ----------------------------------------------------------------------------------------
+def tree_is_visible(grid, index):
+    "Return true if the tree at index is visible from the edge."
+    for offset in grid.offsets:
+        if look_direction(grid, index, offset):
+            return True
+    return False
+
+# ----------------------------------------------------------------------------------------
+def part1(grid):
+    "Count the trees that can be seen from the edge of the grid."
+    count = 0
+    for index in grid.indexes():
+        if tree_is_visible(grid, index):
+            if options.debug:
+                (row, column) = grid.position(index)
+                debugf("Tree of height %c at (%d, %s) is visible",
+                       grid.cells[index], row, column)
+            count += 1
+    return count
+
+# ----------------------------------------------------------------------------------------
+# Part Two
+# ----------------------------------------------------------------------------------------
+def count_trees(grid, index, offset):
+    "Return the number of trees visible from a given tree."
+    cells = grid.cells
+    height = cells[index]
+    count = 0
+    # Count trees until we reach the edge of the grid...
+    index += offset
+    while cells[index] != EDGE:
+        count += 1
+        # Or until the neighboring tree blocks the view.
+        if cells[index] >= height:
+            break
+        index += offset
+    ops["view_steps"] += count
+    return count
+
+# ----------------------------------------------------------------------------------------
+def scenic_score(grid, index):
+    "Return the scenic score for a tree."
+    (up, right, down, left) = [count_trees(grid, index, offset)
+                               for offset in grid.offsets]
+    ss = up * left * down * right
+    if options.debug:
+        (row, column) = grid.position(index)
+        debugf("  scenic score: (%d, %d), height=%c = %d * %d * %d * %d = %d)",
+               row, column, grid.cells[index], up, left, down, right, ss)
+    return ss
+
+def part2(grid):
+    "Choose the best scenic score from all of the trees."
+    best = 0
+    for index in grid.indexes():
+        ss = scenic_score(grid, index)
+        if ss > best:
+            debugf("best scenic score at: %s is %s", grid.position(index), ss)
+            best = ss
+    return best
+
+# ----------------------------------------------------------------------------------------
+# Rows engine
+# ----------------------------------------------------------------------------------------
+def look_direction_rows(grid, row, column, row_direction, column_direction,
+                        height = None):
     """
     Return true if the tree is visible from the edge looking in a certain direction.
     """
@@ -51,40 +139,35 @@ def look_direction(grid, row, column, row_direction, column_direction, height =
     if neighbor_height >= height:
         return False
     # Otherwise we need to keep looking in the same direction from the neighbor.
-    return look_direction(grid, neighbor_row, neighbor_column,
-                          row_direction, column_direction, height)
+    return look_direction_rows(grid, neighbor_row, neighbor_column,
+                               row_direction, column_direction, height)
 
-# ----------------------------------------------------------------------------------------
-def tree_is_visible(grid, row, column):
+def tree_is_visible_rows(grid, row, column):
     "Return true if the tree at row and column is visible from the edge."
-    if look_direction(grid, row, column, 1, 0):
+    if look_direction_rows(grid, row, column, 1, 0):
         return True
-    if look_direction(grid, row, column, -1, 0):
+    if look_direction_rows(grid, row, column, -1, 0):
         return True
-    if look_direction(grid, row, column, 0, 1):
+    if look_direction_rows(grid, row, column, 0, 1):
         return True
-    if look_direction(grid, row, column, 0, -1):
+    if look_direction_rows(grid, row, column, 0, -1):
         return True
     return False
 
-# ----------------------------------------------------------------------------------------
-def part1(grid):
+def part1_rows(grid):
     "Count the trees that can be seen from the edge of the grid."
     count = 0
     height = len(grid)
     width = len(grid[0])
     for row in range(height):
         for column in range(width):
-            if tree_is_visible(grid, row, column):
-                debug("Tree of height %s at (%d, %s) is visible" % (
-                    grid[row][column], row, column))
+            if tree_is_visible_rows(grid, row, column):
+                debugf("Tree of height %s at (%d, %s) is visible",
+                       grid[row][column], row, column)
                 count += 1
-    print(count)
+    return count
 
-# ----------------------------------------------------------------------------------------
-# Part Two
-# ----------------------------------------------------------------------------------------
-def count_trees(grid, row, column, row_direction, column_direction, height = None):
+def count_trees_rows(grid, row, column, row_direction, column_direction, height = None):
     "Return the number of trees visible from a given tree."
     # If no height was provided, use the height of the current tree.
     if height is None:
@@ -99,61 +182,101 @@ def count_trees(grid, row, column, row_direction, column_direction, height = Non
     # If the neighboring tree blocks the view from the edge of the grid...
     if neighbor_height >= height:
         return 1
-    # Otherwise we can see this tree and some additional number in the direction we're looking.
-    return 1 + count_trees(grid, neighbor_row, neighbor_column,
-                           row_direction, column_direction, height)
+    # Otherwise we can see this tree and some additional number in the direction we're
+    # looking.
+    return 1 + count_trees_rows(grid, neighbor_row, neighbor_column,
+                                row_direction, column_direction, height)
 
-# ----------------------------------------------------------------------------------------
-def scenic_score(grid, row, column):
+def scenic_score_rows(grid, row, column):
     "Return the scenic score for a tree."
-    up = count_trees(grid, row, column, 0, -1)
-    left = count_trees(grid, row, column, -1, 0)
-    down = count_trees(grid, row, column, 0, 1)
-    right = count_trees(grid, row, column, 1, 0)
+    up = count_trees_rows(grid, row, column, 0, -1)
+    left = count_trees_rows(grid, row, column, -1, 0)
+    down = count_trees_rows(grid, row, column, 0, 1)
+    right = count_trees_rows(grid, row, column, 1, 0)
     ss = up * left * down * right
-    debug("  scenic score: (%d, %d), height=%s = %d * %d * %d * %d = %d)" % (
-        row, column, grid[row][column], up, left, down, right, ss))
+    debugf("  scenic score: (%d, %d), height=%s = %d * %d * %d * %d = %d)",
+           row, column, grid[row][column], up, left, down, right, ss)
     return ss
 
-def part2(grid):
+def part2_rows(grid):
     "Choose the best scenic score from all of the trees."
     best = 0
     height = len(grid)
     width = len(grid[0])
     for row in range(height):
         for column in range(width):
-            ss = scenic_score(grid, row, column)
+            ss = scenic_score_rows(grid, row, column)
             if ss > best:
-                debug("best scenic score at: (%s, %s) is %s" % (row, column, ss))
+                debugf("best scenic score at: (%s, %s) is %s", row, column, ss)
                 best = ss
-    print(best)
+    return best
+
+def read_rows(data):
+    "Read the challenge input as a list of lists of characters."
+    return [list(line) for line in lines(data)]
 
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
+def input_stats(grid):
+    "Return the size of the grid of trees."
+    return {"width": grid.width, "height": grid.height}
+
+def choose_engine(stats):
+    "The grid engine is always faster than the rows engine."
+    return "grid"
 
 # ----------------------------------------------------------------------------------------
 def debug_grid(grid):
     "Display the gyrocopter tree height grid."
-    for row in grid:
-        debug(row)
+    if not options.debug:
+        return
+    debug(grid.render())
 
 # ----------------------------------------------------------------------------------------
-def read_input():
-    "Read the challenge input."
-    grid = []
-    for line in sys.stdin:
-        line = line.rstrip()
-        grid.append(list(line))
-    return grid
+def read_input(data):
+    """
+    Read the challenge input.
 
-if __name__ == '__main__':
-    grid = read_input()
+    Each tree's height is the byte value of its digit, which compares the same way as the
+    digit itself.  The grid is surrounded by an EDGE border.
+    """
+    return Grid.from_rows(grid_rows(data), border=EDGE)
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        grid = read_input(data)
+    with phase("stats"):
+        engine = select(ENGINES, input_stats(grid), choose_engine)
+    if engine == "rows":
+        with phase("parse"):
+            return (engine, read_rows(data))
     debug_grid(grid)
-    if options.part == 1:
-        part1(grid)
-    else:
-        part2(grid)
+    return (engine, grid)
+
+def solve_prepared(part, state):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    (engine, grid) = state
+    with phase("solve"):
+        if engine == "rows":
+            return part1_rows(grid) if part == 1 else part2_rows(grid)
+        if part == 1:
+            return part1(grid)
+        else:
+            return part2(grid)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
+if __name__ == '__main__':
+    main(solve)
 
 # Part one solution for test-input1 is: 21
 # Part two solution for test-input1 is: 8
@@ -2,34 +2,39 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 9."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc import trace
+from aoc.coords import Plane
+from aoc.engines import select
+from aoc.infra import debug, debugf, lines, main, options
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
 # ========================================================================================
 
+# The engines for simulating the rope.  The bitmap and hashset engines move knots packed
+# into integers (see aoc.coords), and record the positions visited by the tail in a
+# bitmap over the bounding box of the head's path, or in a set.  The tuples engine moves
+# (x, y) tuples with move_knot().
+ENGINES = ("bitmap", "hashset", "tuples")
+REFERENCE_ENGINE = "tuples"
+# The largest bounding box (in cells) that the bitmap engine is used for.
+BITMAP_CELLS = 1 << 24
+# The change in position for each step in a direction.
+DIRECTIONS = {'R': (1, 0), 'L': (-1, 0), 'U': (0, 1), 'D': (0, -1)}
+
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
@@ -59,18 +64,53 @@ def move_knot(head_pos, tail_pos):
     return tail_pos
 
 # ----------------------------------------------------------------------------------------
-def read_input(num_knots):
+def read_input(data):
+    "Read the challenge input as a list of (direction, amount) motions."
+    motions = []
+    for line in lines(data):
+        (direction, amount) = line.split()
+        motions.append((direction, int(amount)))
+    return motions
+
+# ----------------------------------------------------------------------------------------
+def input_stats(motions):
+    """
+    Return the number of steps and the bounding box of the path of the head.
+
+    Each knot only ever moves towards the knot ahead of it, so the tail stays inside the
+    bounding box of the head's path too.
+    """
+    (x, y) = (0, 0)
+    (min_x, max_x, min_y, max_y) = (0, 0, 0, 0)
+    steps = 0
+    for (direction, amount) in motions:
+        (dx, dy) = DIRECTIONS[direction]
+        x += dx * amount
+        y += dy * amount
+        min_x = min(min_x, x)
+        max_x = max(max_x, x)
+        min_y = min(min_y, y)
+        max_y = max(max_y, y)
+        steps += amount
+    return {"steps": steps, "min_x": min_x, "max_x": max_x, "min_y": min_y,
+            "max_y": max_y, "cells": (max_x - min_x + 1) * (max_y - min_y + 1)}
+
+def choose_engine(stats):
+    "Use a bitmap unless the bounding box is too large for one."
+    return "bitmap" if stats["cells"] <= BITMAP_CELLS else "hashset"
+
+# ----------------------------------------------------------------------------------------
+def simulate(motions, num_knots):
+    "Move a rope of num_knots knots and return the number of positions the tail visited."
     # The position of each knot.
     # Right is positive, left is negative, up is postive, down is negative.
     # (0, 0) is the starting location.
     knots = [(0, 0)] * num_knots
     visited = set()
-    for line in sys.stdin:
-        line = line.rstrip()
-        (direction, amount) = line.split()
+    for (direction, amount) in motions:
         debug(direction, amount)
         # One step at a time...
-        for step in range(int(amount)):
+        for step in range(amount):
             # Move the head.
             if direction == 'R':
                 knots[0] = (knots[0][0] + 1, knots[0][1])
@@ -87,17 +127,97 @@ def read_input(num_knots):
                 knots[i+1] = move_knot(previous_knot, knots[i+1])
 
             # Report the position of the head and the tail.
-            debug("  head=%s tail=%s" % (knots[0], knots[num_knots-1]))
+            debugf("  head=%s tail=%s", knots[0], knots[num_knots-1])
+            if trace.tracer:
+                trace.emit("knot_move", direction=direction, head=knots[0],
+                           tail=knots[num_knots-1])
             # The tail has visited this position.
             visited.add(knots[num_knots-1])
-    return visited
+    return len(visited)
+
+# ----------------------------------------------------------------------------------------
+def follow_table(plane):
+    """
+    Return how far each knot moves for each packed difference from the knot ahead of it.
+
+    A knot is never more than two steps from the knot ahead of it in either direction, and
+    the table is filled in by move_knot() for each of those differences.
+    """
+    follow = {}
+    for dx in range(-2, 3):
+        for dy in range(-2, 3):
+            (mx, my) = move_knot((dx, dy), (0, 0))
+            follow[plane.offset(dx, dy)] = plane.offset(mx, my)
+    return follow
+
+def simulate_packed(motions, num_knots, engine, stats):
+    "Move a rope of num_knots packed knots and return the number of positions visited."
+    visited = set()
+    bitmap = None
+    # Every knot stays within the bounding box of the head's path.  Leave a margin, so
+    # that the differences between knots are packed uniquely.
+    plane = Plane(stats["min_x"] - 2, stats["min_y"] - 2,
+                  stats["max_x"] - stats["min_x"] + 5)
+    if engine == "bitmap":
+        bitmap = bytearray(plane.width * (stats["max_y"] - stats["min_y"] + 5))
+    follow = follow_table(plane)
+    steps = {direction: plane.offset(dx, dy)
+             for (direction, (dx, dy)) in DIRECTIONS.items()}
+    knots = [plane.pack(0, 0)] * num_knots
+    tail = num_knots - 1
+    for (direction, amount) in motions:
+        debug(direction, amount)
+        step = steps[direction]
+        for n in range(amount):
+            knots[0] += step
+            # Have the other knots follow, until one of them doesn't move.
+            for i in range(1, num_knots):
+                move = follow[knots[i-1] - knots[i]]
+                if not move:
+                    break
+                knots[i] += move
+            if options.debug:
+                debugf("  head=%s tail=%s", plane.unpack(knots[0]),
+                       plane.unpack(knots[tail]))
+            if trace.tracer:
+                trace.emit("knot_move", direction=direction, head=plane.unpack(knots[0]),
+                           tail=plane.unpack(knots[tail]))
+            if bitmap is None:
+                visited.add(knots[tail])
+            else:
+                bitmap[knots[tail]] = 1
+    if bitmap is None:
+        return len(visited)
+    return bitmap.count(1)
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        motions = read_input(data)
+    with phase("stats"):
+        stats = input_stats(motions)
+    return (motions, select(ENGINES, stats, choose_engine), stats)
+
+def solve_prepared(part, state):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    (motions, engine, stats) = state
+    num_knots = 2 if part == 1 else 10
+    with phase("solve"):
+        if engine == "tuples":
+            return simulate(motions, num_knots)
+        return simulate_packed(motions, num_knots, engine, stats)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    if options.part == 1:
-        visited = read_input(2)
-    else:
-        visited = read_input(10)
-    print(len(visited))
+    main(solve)
 
 # Part one solution for test-input1 is: 13
 # Part two solution for test-input2 is: 36
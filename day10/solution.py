@@ -2,29 +2,20 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 10."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import debug, debugf, lines, main, options
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
@@ -40,34 +31,38 @@ def part1(history):
         (cycle, X) = history[chosen-1]
         strengths.append(cycle * X)
     debug(strengths)
-    print(sum(strengths))
+    return sum(strengths)
 
 # ----------------------------------------------------------------------------------------
 # Part Two
 # ----------------------------------------------------------------------------------------
 def part2(history):
     "Render the screen image."
-    row = 0
+    rows = []
+    row = []
     column = 0
     for (cycle, X) in history:
         # If the raster column is one before X, on X, or after, light the pixel.
         if column == (X-1) or column == X or column == (X+1):
-            print("#", end = '')
+            row.append("#")
         # Otehrwise the pixel is dark.
         else:
-            print(".", end = '')
+            row.append(".")
         # Advance to the next raster column on the next cycle.
         column += 1
         # If we're in the laster column, return to the first column on the next line.
         if cycle % 40 == 0:
-            row += 1
+            rows.append(''.join(row))
+            row = []
             column = 0
-            print()
+    # The final cycle in the history is after the program ends, so its partial row is
+    # not part of the image.
+    return '\n'.join(rows)
 
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
-def read_input():
+def read_input(data):
     "Process the challenge input, execute, and produce an execution history."
     # The value of the X register.
     X = 1
@@ -75,8 +70,7 @@ def read_input():
     cycle = 1
     # The history of the machine state.
     history = []
-    for line in sys.stdin:
-        line = line.rstrip()
+    for line in lines(data):
         # Addx takes two cycles, and adds the value to X.
         if line.startswith("addx "):
             history.append((cycle, X))
@@ -91,19 +85,38 @@ def read_input():
     # Add one final cycle.
     history.append((cycle, X))
     # Report the entire history for debugging.
-    for (cycle, X) in history:
-        debug("cycle=%d X=%d strength=%d" % (cycle, X, cycle * X))
+    if options.debug:
+        for (cycle, X) in history:
+            debugf("cycle=%d X=%d strength=%d", cycle, X, cycle * X)
     # And return it.
     return history
 
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
+
+def solve_prepared(part, history):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        if part == 1:
+            return part1(history)
+        else:
+            return part2(history)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
 if __name__ == '__main__':
-    history = read_input()
-    if options.part == 1:
-        part1(history)
-    else:
-        part2(history)
+    main(solve)
 
-# Part one solution for test-input1 is: 13140
+# Part one solution for test-input2 is: 13140
 # Part two solution for test-input2 is:
 # ##..##..##..##..##..##..##..##..##..##..
 # ###...###...###...###...###...###...###.
@@ -2,29 +2,24 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 11."""
 
+import copy
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc import trace
+from aoc.infra import debug, debugf, lines, main, options
+from aoc.extract import integers
+from aoc.inputs import split_groups
+from aoc.instrument import ops, phase
 
 # ========================================================================================
 # Solution
@@ -37,17 +32,18 @@ def part1(monkeys):
     "Solve part 1: Twenty rounds and then calculate the monkey business value."
     for round_num in range(20):
         do_round(monkeys)
-        debug("After round %d, the monkeys are holding items with these worry levels:" % (round_num + 1))
+        debugf("After round %d, the monkeys are holding items with these worry levels:",
+               round_num + 1)
         for monkey in monkeys.values():
-            debug("Monkey %d inspected items %d times." % (monkey.num, monkey.activity))
+            debugf("Monkey %d inspected items %d times.", monkey.num, monkey.activity)
 
     debug("The most active monkeys are:")
     active_monkeys = sorted(monkeys.values(), key=lambda monkey: monkey.activity, reverse=True)
     for monkey in active_monkeys:
-        debug("Monkey %d inspected items %d times." % (monkey.num, monkey.activity))
+        debugf("Monkey %d inspected items %d times.", monkey.num, monkey.activity)
 
     monkey_business = active_monkeys[0].activity * active_monkeys[1].activity
-    print(monkey_business)
+    return monkey_business
 
 # ----------------------------------------------------------------------------------------
 # Part Two
@@ -71,17 +67,17 @@ def part2(monkeys):
     for round_num in range(10000):
         do_round(monkeys, detail=False)
         if round_num + 1 in [1, 20, 1000, 2000, 3000, 4000, 5000, 6000, 7000, 8000, 9000, 10000]:
-            debug("== After round %d ==" % (round_num + 1))
+            debugf("== After round %d ==", round_num + 1)
             for monkey in monkeys.values():
-                debug("Monkey %d inspected items %d times." % (monkey.num, monkey.activity))
+                debugf("Monkey %d inspected items %d times.", monkey.num, monkey.activity)
 
     debug("The most active monkeys are:")
     active_monkeys = sorted(monkeys.values(), key=lambda monkey: monkey.activity, reverse=True)
     for monkey in active_monkeys:
-        debug("Monkey %d inspected items %d times." % (monkey.num, monkey.activity))
+        debugf("Monkey %d inspected items %d times.", monkey.num, monkey.activity)
 
     monkey_business = active_monkeys[0].activity * active_monkeys[1].activity
-    print(monkey_business)
+    return monkey_business
 
 # ----------------------------------------------------------------------------------------
 # Shared
@@ -128,23 +124,25 @@ class Monkey(object):
         assert(False)
 
     def inspect(self, monkeys, detail=True):
+        # Only report the details when we're actually debugging.
+        detail = detail and options.debug
         if detail:
-            debug("Monkey %d:" % self.num)
+            debugf("Monkey %d:", self.num)
         for item in self.items:
             # This monkey has inspected an item.  Increase it's activity by one.
             self.activity += 1
             # Emir the output from the challenge.
             if detail:
-                debug("  Monkey inspects and item with a worry level of %d." % item)
+                debugf("  Monkey inspects and item with a worry level of %d.", item)
             worry = self.operation(item)
             if detail:
-                debug("    Worry level %s by %s to %s" % (self.opr_str, self.arg, worry))
+                debugf("    Worry level %s by %s to %s", self.opr_str, self.arg, worry)
                 debug("    Monkey gets bored with item. ", end = '')
             # In part 2, we're no longer reducing the worry leve with each inspection.
             if self.reduction:
                 worry = int(worry/3)
                 if detail:
-                    debug("    Worry level is divided by 3 to %d." % worry)
+                    debugf("    Worry level is divided by 3 to %d.", worry)
             if worry % self.divisible == 0:
                 target = self.true_target
                 tstr = ''
@@ -152,17 +150,27 @@ class Monkey(object):
                 target = self.false_target
                 tstr = 'not '
             if detail:
-                debug("    Current worry level is %sdivisible by %d." % (tstr, self.divisible))
-                debug("    Item with worry level %d is thrown to monkey %d." % (worry, target))
+                debugf("    Current worry level is %sdivisible by %d.",
+                       tstr, self.divisible)
+                debugf("    Item with worry level %d is thrown to monkey %d.",
+                       worry, target)
 
             # And as a consequence, in order to keep the numbers from becoming
             # ridiculously large (in other words, TOO LARGE), we need to reduce it.
             if not self.reduction:
                 worry = worry % self.product
 
+            if trace.tracer:
+                trace.emit("monkey_throw", monkey=self.num, worry=worry, target=target)
             monkeys[target].items.append(worry)
         self.items = []
 
+    def copy(self):
+        "Return a copy of the monkey holding its own list of items."
+        monkey = copy.copy(self)
+        monkey.items = list(self.items)
+        return monkey
+
     def __str__(self):
         "Return the monkey as a string for debugging."
         return "Monkey(%d), new=old%s%s x%%%d?%s:%s activity=%d items=%s" % (
@@ -176,41 +184,67 @@ def do_round(monkeys, detail=True):
         monkey.inspect(monkeys, detail)
 
 # ----------------------------------------------------------------------------------------
-def read_input():
-    "Read the challenge input and initialize the monkeys."
-    monkeys = {}
+def read_monkey(record):
+    "Read a monkey from its group of lines in the challenge input."
     monkey = None
-    for line in sys.stdin:
-        line = line.rstrip()
+    for line in lines(record):
         if line.startswith("Monkey "):
-            monkey = Monkey(int(line[7]))
+            monkey = Monkey(integers(line)[0])
         elif line.startswith("  Starting items: "):
-            monkey.items = [int(x) for x in line[18:].split(', ')]
+            monkey.items = list(integers(line))
         elif line.startswith("  Operation: new = old "):
             monkey.operator = line[23]
             monkey.arg = line[25:]
         elif line.startswith("  Test: divisible by "):
-            monkey.divisible = int(line[21:])
+            monkey.divisible = integers(line)[0]
         elif line.startswith("    If true: throw to monkey "):
-            monkey.true_target = int(line[29])
+            monkey.true_target = integers(line)[0]
         elif line.startswith("    If false: throw to monkey "):
-            monkey.false_target = int(line[30])
-        elif line == "":
-            debug(str(monkey))
-            monkeys[monkey.num] = monkey
-            monkey = None
+            monkey.false_target = integers(line)[0]
         else:
             print("Unexpected line: '%s'" % line, file=sys.stderr)
-    debug(str(monkey))
-    monkeys[monkey.num] = monkey
+    return monkey
+
+# ----------------------------------------------------------------------------------------
+def read_input(data):
+    "Read the challenge input and initialize the monkeys."
+    monkeys = {}
+    for record in split_groups(data):
+        monkey = read_monkey(record)
+        debug(monkey)
+        monkeys[monkey.num] = monkey
     return monkeys
 
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
+
+def solve_prepared(part, monkeys):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    # The monkeys throw their items around, so each part starts from a fresh copy.
+    monkeys = {num: monkey.copy() for (num, monkey) in monkeys.items()}
+    with phase("solve"):
+        if part == 1:
+            answer = part1(monkeys)
+        else:
+            answer = part2(monkeys)
+    # A monkey's activity is the number of items it inspected.
+    for monkey in monkeys.values():
+        ops["inspections_monkey_%02d" % monkey.num] += monkey.activity
+    return answer
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
 if __name__ == '__main__':
-    monkeys = read_input()
-    if options.part == 1:
-        part1(monkeys)
-    else:
-        part2(monkeys)
+    main(solve)
 
 # Part one solution for test-input1 is: 10605
 # Part two solution for test-input1 is: 2713310158
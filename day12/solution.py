@@ -2,35 +2,40 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 12."""
 
+import os
 import sys
-from optparse import OptionParser
 from collections import defaultdict
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc import trace
+from aoc.engines import select
+from aoc.grid import Grid
+from aoc.infra import debug, debugf, lines, main, options
+from aoc.inputs import grid_rows
+from aoc.instrument import ops, phase
 
 # ========================================================================================
 # Solution
 # ========================================================================================
 
+# The value of the cells in the border around the elevations map.  It's higher than any
+# elevation, so that there's never a path off of the map.
+EDGE = 0xff
+
+# The engines for building the graph: from a bordered Grid of bytes, with the indexes of
+# the cells as the nodes, or from the original lists of characters, with "row-column"
+# strings as the nodes.  Both search the graph with the same dijsktra().
+ENGINES = ("grid", "rows")
+REFERENCE_ENGINE = "rows"
+
 # ----------------------------------------------------------------------------------------
 # Part One
 # ----------------------------------------------------------------------------------------
@@ -38,8 +43,8 @@ def part1(graph):
     "Solve part1, which is to find the shortest path from start to goal."
     path = dijsktra(graph, 'start', 'goal')
     debug(path)
-    # Print the length of the shortest path.
-    print(len(path) - 3)
+    # Return the length of the shortest path.
+    return len(path) - 3
 
 # ----------------------------------------------------------------------------------------
 # Part Two
@@ -48,6 +53,45 @@ def part2(graph, elevations):
     """
     Solve part2, find a starting location that provides the shortest path to the goal.
 
+    The starting location must at elevation 'a'.
+    """
+    bestlen = None
+    bestpath = None
+    for src in elevations.indexes():
+        # The starting location must be at elevation 'a', and must have an adjacent cell
+        # at elevation 'b'.
+        if elevations.cells[src] == ord('a') and adjacentb(elevations, src):
+            graph.add_edge('start', src, 0)
+            path = dijsktra(graph, 'start', 'goal')
+            pathlen = len(path) - 3
+            if bestlen is None or pathlen < bestlen:
+                bestlen = pathlen
+                bestpath = path
+                debugf("New shortest path is %d steps", bestlen)
+            graph.remove_start(src)
+    debug(bestpath)
+    return bestlen
+
+def adjacentb(elevations, index):
+    """
+    Return True if there is an elevation 'b' adjacent to index.
+
+    Performance without this optimization is kind of bad, so I added it to speed things
+    up.  In my input at least, there were a lot of cells with elevation 'a' and very few
+    cells with elevation 'b'.
+    """
+    for neighbor in elevations.neighbors(index):
+        if elevations.cells[neighbor] == ord('b'):
+            return True
+    return False
+
+# ----------------------------------------------------------------------------------------
+# Rows engine
+# ----------------------------------------------------------------------------------------
+def part2_rows(graph, elevations):
+    """
+    Solve part2, find a starting location that provides the shortest path to the goal.
+
     The starting location must at elevation 'a'.
     """
     bestlen = None
@@ -56,7 +100,7 @@ def part2(graph, elevations):
         for col in range(len(elevations[row])):
             # The starting location must be at elevation 'a', and must have an adjacent
             # cell at elevation 'b'.
-            if elevations[row][col] == 'a' and adjacentb(elevations, row, col):
+            if elevations[row][col] == 'a' and adjacentb_rows(elevations, row, col):
                 src = "%d-%d" % (row, col)
                 graph.add_edge('start', src, 0)
                 path = dijsktra(graph, 'start', 'goal')
@@ -64,42 +108,115 @@ def part2(graph, elevations):
                 if bestlen is None or pathlen < bestlen:
                     bestlen = pathlen
                     bestpath = path
-                    debug("New shortest path is %d steps" % (bestlen))
+                    debugf("New shortest path is %d steps", bestlen)
                 graph.remove_start(src)
     debug(bestpath)
-    print(bestlen)
+    return bestlen
 
-def adjacentb(elevations, row, col):
+def adjacentb_rows(elevations, row, col):
     """
     Return True if there is an elevation 'b' adjacent to (r,c).
 
-    Performance without this optimization is kind of bad, so I added it to speed things
-    up.  In my input at least, there were a lot of cells with elevation 'a' and very few
-    cells with elevation 'b'.
+    The original returned False (instead of True) for a 'b' to the south, which the grid
+    engine fixed, so the south is checked the same way as the other directions here.
     """
     # East
-    if allowed(elevations, row, col+1, elevations[row][col]):
+    if allowed_rows(elevations, row, col+1, elevations[row][col]):
         if elevations[row][col+1] == 'b':
             return True
     # West
-    if allowed(elevations, row, col-1, elevations[row][col]):
+    if allowed_rows(elevations, row, col-1, elevations[row][col]):
         if elevations[row][col-1] == 'b':
             return True
     # North
-    if allowed(elevations, row-1, col, elevations[row][col]):
+    if allowed_rows(elevations, row-1, col, elevations[row][col]):
         if elevations[row-1][col] == 'b':
             return True
     # South
-    if allowed(elevations, row+1, col, elevations[row][col]):
+    if allowed_rows(elevations, row+1, col, elevations[row][col]):
         if elevations[row+1][col] == 'b':
-            return False
+            return True
+    return False
+
+def elevations2graph_rows(elevations, start, goal):
+    "Convert the elevations map to a graph with edges indicating allowed movement."
+    graph = Graph()
+    for row in range(len(elevations)):
+        for col in range(len(elevations[row])):
+            src = "%d-%d" % (row, col)
+            # East
+            if allowed_rows(elevations, row, col+1, elevations[row][col]):
+                dst = "%d-%d" % (row, col+1)
+                graph.add_edge(src, dst, 1)
+            # West
+            if allowed_rows(elevations, row, col-1, elevations[row][col]):
+                dst = "%d-%d" % (row, col-1)
+                graph.add_edge(src, dst, 1)
+            # North
+            if allowed_rows(elevations, row-1, col, elevations[row][col]):
+                dst = "%d-%d" % (row-1, col)
+                graph.add_edge(src, dst, 1)
+            # South
+            if allowed_rows(elevations, row+1, col, elevations[row][col]):
+                dst = "%d-%d" % (row+1, col)
+                graph.add_edge(src, dst, 1)
+    graph.add_edge("start", "%d-%d" % (start[0], start[1]), 0)
+    graph.add_edge("%d-%d" % (goal[0], goal[1]), "goal", 0)
+    return graph
+
+def allowed_rows(elevations, r, c, e):
+    "Return True if you are allowed to move to (r,c) from elevation e."
+    # Start with the easiest bounds checks.
+    if r < 0 or c < 0:
+        return False
+    # Then the other bounds checks.
+    width = len(elevations[0])
+    height = len(elevations)
+    if c >= width:
+        return False
+    if r >= height:
+        return False
+    # Finally, the destination elevation can be at most one higher than the starting
+    # elevation.  If that's true, the movement is allowed.
+    dest_elev = elevations[r][c]
+    if ord(dest_elev) <= ord(e) + 1:
+        return True
+    # Otherwise the movement is not allowed.
+    return False
+
+def read_rows(data):
+    "Read the challenge input as an elevation map of lists of characters."
+    start = None
+    goal = None
+    elevations = []
+    for (r, line) in enumerate(lines(data)):
+        row = []
+        for c, elev in enumerate(list(line)):
+            if elev == 'S':
+                start = (r, c)
+                elev = 'a'
+            elif elev == 'E':
+                goal = (r, c)
+                elev = 'z'
+            row.append(elev)
+        elevations.append(row)
+    return(start, goal, elevations)
 
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
+def input_stats(elevations):
+    "Return the size of the elevations map."
+    return {"width": elevations.width, "height": elevations.height}
+
+def choose_engine(stats):
+    "The grid engine is always faster than the rows engine."
+    return "grid"
+
 def debug_elevations(elevations):
-    for row in elevations:
-        debug(''.join(row))
+    if not options.debug:
+        return
+    debug(elevations.render())
 
 # Dijsktra's algorithm courtesy of:
 # https://benalexkeen.com/implementing-djikstras-shortest-path-algorithm-with-python/
@@ -136,6 +253,8 @@ def dijsktra(graph, initial, end):
         visited.add(current_node)
         destinations = graph.edges[current_node]
         weight_to_current_node = shortest_paths[current_node][1]
+        ops["dijkstra_nodes"] += 1
+        ops["dijkstra_edges"] += len(destinations)
 
         for next_node in destinations:
             weight = graph.weights[(current_node, next_node)] + weight_to_current_node
@@ -147,6 +266,11 @@ def dijsktra(graph, initial, end):
                     shortest_paths[next_node] = (current_node, weight)
 
         next_destinations = {node: shortest_paths[node] for node in shortest_paths if node not in visited}
+        # Finding the next node scans every node reached so far.
+        ops["dijkstra_scanned"] += len(shortest_paths)
+        if trace.tracer:
+            trace.emit("dijkstra_expand", node=current_node,
+                       weight=weight_to_current_node, frontier=len(next_destinations))
         if not next_destinations:
             return "Route Not Possible"
         # next node is the destination with the lowest weight
@@ -163,88 +287,93 @@ def dijsktra(graph, initial, end):
     return path
 
 def elevations2graph(elevations, start, goal):
-    "Convert the elevations map to a graph with edges indicating allowed movement."
+    """
+    Convert the elevations map to a graph with edges indicating allowed movement.
+
+    The nodes of the graph are the indexes of the cells in the elevations grid.
+    """
     graph = Graph()
-    for row in range(len(elevations)):
-        for col in range(len(elevations[row])):
-            src = "%d-%d" % (row, col)
-            # East
-            if allowed(elevations, row, col+1, elevations[row][col]):
-                dst = "%d-%d" % (row, col+1)
-                graph.add_edge(src, dst, 1)
-            # West
-            if allowed(elevations, row, col-1, elevations[row][col]):
-                dst = "%d-%d" % (row, col-1)
-                graph.add_edge(src, dst, 1)
-            # North
-            if allowed(elevations, row-1, col, elevations[row][col]):
-                dst = "%d-%d" % (row-1, col)
-                graph.add_edge(src, dst, 1)
-            # South
-            if allowed(elevations, row+1, col, elevations[row][col]):
-                dst = "%d-%d" % (row+1, col)
+    cells = elevations.cells
+    for src in elevations.indexes():
+        for dst in elevations.neighbors(src):
+            if allowed(cells[dst], cells[src]):
                 graph.add_edge(src, dst, 1)
-    graph.add_edge("start", "%d-%d" % (start[0], start[1]), 0)
-    graph.add_edge("%d-%d" % (goal[0], goal[1]), "goal", 0)
+    graph.add_edge("start", start, 0)
+    graph.add_edge(goal, "goal", 0)
     return graph
 
-def allowed(elevations, r, c, e):
-    "Return True if you are allowed to move to (r,c) from elevation e."
-    # Start with the easiest bounds checks.
-    if r < 0 or c < 0:
-        return False
-    # Then the other bounds checks.
-    width = len(elevations[0])
-    height = len(elevations)
-    if c >= width:
-        return False
-    if r >= height:
-        return False
-    # Finally, the destination elevation can be at most one higher than the starting
-    # elevation.  If that's true, the movement is allowed.
-    dest_elev = elevations[r][c]
-    if ord(dest_elev) <= ord(e) + 1:
-        return True
-    # Otherwise the movement is not allowed.
-    return False
+def allowed(dest_elev, e):
+    """
+    Return True if you are allowed to move to elevation dest_elev from elevation e.
 
-def read_input():
+    The destination elevation can be at most one higher than the starting elevation.  The
+    border around the elevations map is higher than any elevation, so you're never
+    allowed to move off of the map.
+    """
+    return dest_elev <= e + 1
+
+def read_input(data):
     "Read the challenge input, which is an elevation map."
-    start = None
-    goal = None
-    elevations = []
-    r = 0
-    for line in sys.stdin:
-        line = line.rstrip()
-        row = []
-        for c, elev in enumerate(list(line)):
-            if elev == 'S':
-                start = (r, c)
-                elev = 'a'
-            elif elev == 'E':
-                goal = (r, c)
-                elev = 'z'
-            #elev = ord(elev) - ord('a')
-            row.append(elev)
-        elevations.append(row)
-        r += 1
+    elevations = Grid.from_rows(grid_rows(data), border=EDGE)
+    # Replace the start and goal markers with their elevations.
+    start = elevations.find(ord('S'))
+    elevations.cells[start] = ord('a')
+    goal = elevations.find(ord('E'))
+    elevations.cells[goal] = ord('z')
     return(start, goal, elevations)
 
-if __name__ == '__main__':
-    (start, goal, elevations) = read_input()
-    debug("start=%s" % str(start))
-    debug("goal=%s" % str(goal))
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        (start, goal, elevations) = read_input(data)
+    with phase("stats"):
+        engine = select(ENGINES, input_stats(elevations), choose_engine)
+    if engine == "rows":
+        with phase("parse"):
+            (start, goal, elevations) = read_rows(data)
+        debugf("start=%s", start)
+        debugf("goal=%s", goal)
+        with phase("build"):
+            graph = elevations2graph_rows(elevations, start, goal)
+        return (engine, "%d-%d" % (start[0], start[1]), elevations, graph)
+    debugf("start=%s", elevations.position(start))
+    debugf("goal=%s", elevations.position(goal))
     debug_elevations(elevations)
-    graph = elevations2graph(elevations, start, goal)
-    if options.part == 1:
-        part1(graph)
-    else:
-        # We're going to vary the start node, so remove it from the graph.
-        graph.remove_start("%d-%d" % (start[0], start[1]))
-        part2(graph, elevations)
+    with phase("build"):
+        graph = elevations2graph(elevations, start, goal)
+    return (engine, start, elevations, graph)
+
+def solve_prepared(part, state):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    (engine, start, elevations, graph) = state
+    with phase("solve"):
+        if part == 1:
+            return part1(graph)
+        else:
+            # We're going to vary the start node, so remove it from the graph.
+            graph.remove_start(start)
+            if engine == "rows":
+                answer = part2_rows(graph, elevations)
+            else:
+                answer = part2(graph, elevations)
+            # And put it back, so that the graph can be used to solve part one again.
+            graph.add_edge('start', start, 0)
+            return answer
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
+if __name__ == '__main__':
+    main(solve)
 
 # Part one solution for test-input1 is: 31
-# Part two solution for test-input2 is: 29
+# Part two solution for test-input1 is: 29
 # Part one solution for input is: 534
 # Part two solution for input is: 525
 
@@ -2,30 +2,22 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 13."""
 
+import os
 import sys
 import functools
-from optparse import OptionParser
+import json
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import debug, debugf, lines, main
+from aoc.instrument import ops, phase
 
 # ========================================================================================
 # Solution
@@ -34,43 +26,35 @@ def debug(*args, **kwargs):
 # ----------------------------------------------------------------------------------------
 # Part One
 # ----------------------------------------------------------------------------------------
-def part1():
+def part1(packets):
     "Solve part 1, determine which packets are in the correct order."
-    # Read the packets in pairs, and evaluate to convert to Python lists.
+    # Group the packets in pairs.
     pairs = []
     pair = []
-    for line in sys.stdin:
-        line = line.rstrip()
-        if line != '':
-            packet = eval(line)
-            pair.append(packet)
-            if len(pair) == 2:
-                pairs.append(pair)
-                pair = []
+    for packet in packets:
+        pair.append(packet)
+        if len(pair) == 2:
+            pairs.append(pair)
+            pair = []
 
     # For each pair of packets determine if they're in the correct order.
     correct_order = []
     for n, pair in enumerate(pairs):
         (left, right) = pair
-        debug("== Pair %s ==" % (n+1))
+        debugf("== Pair %s ==", n+1)
         if compare(left, right) == -1:
             correct_order.append(n+1)
         debug()
     # Report the pairs that were in the correct order.
-    debug("The pairs in the correct order are: %s" % str(correct_order))
-    print(sum(correct_order))
+    debugf("The pairs in the correct order are: %s", correct_order)
+    return sum(correct_order)
 
 # ----------------------------------------------------------------------------------------
 # Part Two
 # ----------------------------------------------------------------------------------------
-def part2():
+def part2(packets):
     "Solve part 2, placing the packets in the correct order and locating dividers."
-    packets = []
-    for line in sys.stdin:
-        line = line.rstrip()
-        if line != '':
-            packet = eval(line)
-            packets.append(packet)
+    packets = list(packets)
     # Add the two divider packets.
     divider2 = [[2]]
     packets.append(divider2)
@@ -91,37 +75,38 @@ def part2():
         debug(packet)
     # Display the locations of the dividers and compute the answer.
     debug()
-    debug("Dividers are at positions: %s and %s" % (dividers[0], dividers[1]))
-    print(dividers[0] * dividers[1])
+    debugf("Dividers are at positions: %s and %s", dividers[0], dividers[1])
+    return dividers[0] * dividers[1]
 
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
 def compare(left, right, indent=''):
     "Return -1 if left comes before right, -1 if not, and zero if equal."
-    debug("%s- Compare %s vs %s" % (indent, left, right))
+    ops["packet_comparisons"] += 1
+    debugf("%s- Compare %s vs %s", indent, left, right)
     mixed_msg = "%s    - Mixed types; convert %s to %s and retry comparison"
     int_msg = "%s    - %s side is smaller, so inputs are %sin the right order"
     for left_value, right_value in zip(left, right):
         if isinstance(left_value, int) and isinstance(right_value, int):
-            debug("%s  - Compare %s vs %s" % (indent, left_value, right_value))
+            debugf("%s  - Compare %s vs %s", indent, left_value, right_value)
             if left_value < right_value:
-                debug(int_msg % (indent, "Left", ""))
+                debugf(int_msg, indent, "Left", "")
                 return -1
             elif left_value > right_value:
-                debug(int_msg % (indent, "Right", "not "))
+                debugf(int_msg, indent, "Right", "not ")
                 return 1
         elif isinstance(left_value, list) and isinstance(right_value, list):
             decision = compare(left_value, right_value, indent + "  ")
             if decision != 0:
                 return decision
         elif isinstance(left_value, int) and isinstance(right_value, list):
-            debug(mixed_msg % (indent, "left", [left_value]))
+            debugf(mixed_msg, indent, "left", [left_value])
             decision = compare([left_value], right_value, indent + "    ")
             if decision != 0:
                 return decision
         elif isinstance(left_value, list) and isinstance(right_value, int):
-            debug(mixed_msg % (indent, "right", [right_value]))
+            debugf(mixed_msg, indent, "right", [right_value])
             decision = compare(left_value, [right_value], indent + "    ")
             if decision != 0:
                 return decision
@@ -136,15 +121,48 @@ def compare(left, right, indent=''):
     debug("    - Both sides were the same length, continue with next element")
     return 0
 
+# ----------------------------------------------------------------------------------------
+def read_input(data):
+    """
+    Read the challenge input, and convert each packet to a Python list.
+
+    The packets are JSON, and are parsed as JSON rather than evaluated, since the input
+    may come from anyone (through --batch or the daemon).
+    """
+    packets = []
+    for line in lines(data):
+        if line != '':
+            packets.append(json.loads(line))
+    return packets
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
+
+def solve_prepared(part, packets):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        if part == 1:
+            return part1(packets)
+        else:
+            return part2(packets)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
 if __name__ == '__main__':
-    if options.part == 1:
-        part1()
-    else:
-        part2()
+    main(solve)
 
 # Part one solution for test-input1 is: 13
-# Part two solution for test-input2 is: 140
-# Part one solution for input is: 5031
+# Part two solution for test-input1 is: 140
+# Part one solution for input is: 5013
 # Part two solution for input is: 25038
 
 # Local Variables:
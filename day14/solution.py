@@ -2,172 +2,320 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 14."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc import trace
+from aoc.coords import Plane
+from aoc.engines import select
+from aoc.extract import integer_lines
+from aoc.infra import debug, debugf, main, options
+from aoc.grid import Grid
+from aoc.instrument import ops, phase
 
 # ========================================================================================
 # Solution
 # ========================================================================================
 
+# What each cell of the grid can hold.
+AIR = ord('.')
+ROCK = ord('#')
+SAND = ord('o')
+SOURCE = ord('+')
+TRACE = ord('~')
+
+# The engines for simulating the sand: a grid of bytes covering everywhere the sand can
+# reach, or a set of the blocked points packed into integers (see aoc.coords).  The drop
+# engine is the original algorithm on the dense grid, which drops every grain from the
+# source instead of resuming from the path of the grain before it.
+ENGINES = ("dense", "sparse", "drop")
+REFERENCE_ENGINE = "drop"
+# The most cells the dense engine's grid may have.
+DENSE_CELLS = 1 << 24
+
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
-def read_input():
+def read_input(data):
     "Read the challenge input as a list of lists of points."
-    lines = []
+    paths = []
     max_y = 0
-    for line in sys.stdin:
-        line = line.rstrip()
-        points = []
-        for term in line.split(' -> '):
-            (x, y) = term.split(',')
-            max_y = max(max_y, int(y))
-            points.append((int(x), int(y)))
-        lines.append(points)
-    return max_y, lines
-
-def make_grid(max_y, lines, part):
-    # Sand can settle at columns 500 plus or minus max_y + 1.  Add a couple of extra
-    # columns to match how part two was displayed in the challenge.
-    min_x = 500 - (max_y + 3)
-    max_x = 500 + (max_y + 3)
-
-    # Fill the grid with "air" (periods).  Include one extra line of air at the bottom.
-    grid = []
-    width = max_x - min_x + 1
-    for y in range(0, max_y + 2):
-        grid.append(['.'] * width)
-
-    # If we're in part two, add a floor beneath the grid.  It doesn't need to extend to
-    # inifinity in each direction, only the width of the grid because we've made the grid
-    # wide enough to catch all grains.
-    if part == 2:
-        grid.append(['#'] * width)
+    # Each line is the x and y of each point on a path.
+    for numbers in integer_lines(data, signed=False):
+        if not numbers:
+            continue
+        points = list(zip(numbers[0::2], numbers[1::2]))
+        max_y = max(max_y, max(numbers[1::2]))
+        paths.append(points)
+    return max_y, paths
 
-    # Mark the entry point of the sand, so our picture matches the challenge (mostly).
-    grid[0][500-min_x] = '+'
-
-    # Draw the barriers in the grid as described by the points.
-    for line in lines:
+def rock_points(paths):
+    "Yield the (x, y) of every point of rock on the paths."
+    for line in paths:
         last_x = None
         last_y = None
         for point in line:
             (x, y) = point
-            #debug("Drawing point (%s=%s, %s)" % (x, x-min_x, y))
             if last_x is None:
-                #debug("Initial point (%s=%s, %s)" % (x, x-min_x, y))
-                grid[y][x-min_x] = '#'
+                yield (x, y)
             elif x == last_x:
-                #debug("Vertical line (%s, %s) -> (%s, %s)" % (last_x, last_y, x, y))
-                if y < last_y:
-                    for ty in range(y, last_y+1):
-                        grid[ty][x-min_x] = '#'
-                else:
-                    for ty in range(last_y, y+1):
-                        grid[ty][x-min_x] = '#'
+                # A vertical line, not including the point it starts from.
+                step = 1 if y > last_y else -1
+                for ty in range(last_y + step, y + step, step):
+                    yield (x, ty)
             elif y == last_y:
-                #debug("Horizontal line (%s, %s) -> (%s, %s)" % (last_x, last_y, x, y))
-                if x < last_x:
-                    for tx in range(x, last_x+1):
-                        grid[y][tx-min_x] = '#'
-                else:
-                    for tx in range(last_x, x+1):
-                        grid[y][tx-min_x] = '#'
+                # A horizontal line, not including the point it starts from.
+                step = 1 if x > last_x else -1
+                for tx in range(last_x + step, x + step, step):
+                    yield (tx, y)
             else:
                 print("Unexpected line point (%d, %d) -> (%d, %d)" % (
                     last_x, last_y, x, y), file=sys.stderr)
             last_x = x
             last_y = y
 
+def input_stats(max_y, paths):
+    "Return the extent and density of the rock, and the size of the dense grid."
+    xs = [x for line in paths for (x, y) in line] or [500]
+    ys = [y for line in paths for (x, y) in line] or [0]
+    rocks = sum(1 for point in rock_points(paths))
+    # The dense grid is as wide as the sand can spread, and tall enough for the floor.
+    grid_cells = (2 * max_y + 7) * (max_y + 3)
+    return {"min_x": min(xs), "max_x": max(xs), "min_y": min(ys), "max_y": max_y,
+            "rocks": rocks, "grid_cells": grid_cells, "density": rocks / grid_cells}
+
+def choose_engine(stats):
+    "Use the dense grid unless it would be too large."
+    return "dense" if stats["grid_cells"] <= DENSE_CELLS else "sparse"
+
+# ----------------------------------------------------------------------------------------
+# Dense engine
+# ----------------------------------------------------------------------------------------
+def make_grid(max_y, paths):
+    # Sand can settle at columns 500 plus or minus max_y + 1.  Add a couple of extra
+    # columns to match how part two was displayed in the challenge.
+    min_x = 500 - (max_y + 3)
+    max_x = 500 + (max_y + 3)
+
+    # Fill the grid with "air" (periods).  Include one extra line of air at the bottom.
+    width = max_x - min_x + 1
+    grid = Grid(width, max_y + 2, fill=AIR)
+
+    # Mark the entry point of the sand, so our picture matches the challenge (mostly).
+    grid[0, 500-min_x] = SOURCE
+
+    # Draw the barriers in the grid as described by the points.  Rock beyond the sides of
+    # the grid is out of reach of the sand.
+    for (x, y) in rock_points(paths):
+        if min_x <= x <= max_x:
+            grid[y, x-min_x] = ROCK
+
     # Display the empty grid withteh obstacles in it.
     debug_grid(grid)
     return grid
 
 def debug_grid(grid):
     "Display the grid."
-    for n, line in enumerate(grid):
-        debug("%3d %s" % (n, ''.join(line)))
+    if not options.debug:
+        return
+    for n, line in enumerate(grid.render().split('\n')):
+        debugf("%3d %s", n, line)
     debug()
 
-def move_sand(grid, x, y, trace=False):
+def move_sand(grid, index, trace=False, path=None):
     """
-    Move a grain of sand from location x, y and return the place where it settles.
+    Move a grain of sand from the cell at index and return the index where it settles.
 
-    If it settles in the "void" return (-1, -1).  If trace is True, draw tildes along the
-    path that the grain of sand traverses.
+    If it settles in the "void" return -1.  If trace is True, draw tildes along the path
+    that the grain of sand traverses.  If path is a list, the index of each cell that the
+    grain moves out of is appended to it.
     """
-    #debug("Sand moved to (%s, %s)" % (x, y))
-    # If the caller requested tracing, record that the sand passes through this location.
-    if trace:
-        grid[y][x] = '~'
-    # If the grain would fall off the map it falls into the void.
-    if y > len(grid) - 2:
-        return (-1, -1)
-    # Fall straight down.
-    if grid[y+1][x] == '.':
-        return move_sand(grid, x, y + 1, trace)
-    # Fall diagonally to the left.
-    elif grid[y+1][x-1] == '.':
-        return move_sand(grid, x - 1, y + 1, trace)
-    # Fall diagonally to the right.
-    elif grid[y+1][x+1] == '.':
-        return move_sand(grid, x + 1, y + 1, trace)
-    # Where the grain of sand came to rest.
-    return(x, y)
-
-def fill_with_sand(grid, part):
+    cells = grid.cells
+    stride = grid.stride
+    # If the grain would fall off the map (out of the bottom row) it falls into the void.
+    bottom = len(cells) - stride
+    # Every step moves the grain down a row, and at most one column to the side, so the
+    # number of steps is the number of rows between where it starts and stops.  (The grid
+    # is more than twice as wide as it is tall, so the sideways moves can't add a row.)
+    start = index
+    while True:
+        #debug("Sand moved to %s" % (grid.position(index),))
+        # If the caller requested tracing, record that the sand passes through here.
+        if trace:
+            cells[index] = TRACE
+        if index >= bottom:
+            ops["sand_steps"] += (index - start + stride // 2) // stride
+            return -1
+        below = index + stride
+        # Fall straight down.
+        if cells[below] == AIR:
+            next_index = below
+        # Fall diagonally to the left.
+        elif cells[below - 1] == AIR:
+            next_index = below - 1
+        # Fall diagonally to the right.
+        elif cells[below + 1] == AIR:
+            next_index = below + 1
+        # Where the grain of sand came to rest.
+        else:
+            ops["sand_steps"] += (index - start + stride // 2) // stride
+            return index
+        if path is not None:
+            path.append(index)
+        index = next_index
+
+def fill_with_sand(grid, part, resume=True):
     """
     Fill the grid with sand, releasing sand from the location marked '+'.
+
+    Each grain follows the path of the grain before it until the cell where that grain
+    settled, so if resume is True, the next grain starts from the cell above that one.
+    Otherwise every grain is dropped from the source, as the drop engine does.
     """
-    start_x = grid[0].index('+')
+    start = grid.find(SOURCE)
+    # The column of the source is x=500.
+    min_x = 500 - grid.position(start)[1]
     grains = 0
-    while True:
-        (x, y) = move_sand(grid, start_x, 0)
-        #debug("Sand settled at (%d, %d)" % (x, y))
-        if x == -1:
+    path = [start]
+    while path:
+        if resume:
+            index = move_sand(grid, path.pop(), path=path)
+        else:
+            index = move_sand(grid, start)
+        #debug("Sand settled at %s" % (grid.position(index),))
+        if index == -1:
             break
         grains += 1
-        grid[y][x] = 'o'
-        if (x, y) == (start_x, 0):
+        grid.cells[index] = SAND
+        if trace.tracer:
+            (y, column) = grid.position(index)
+            trace.emit("sand_settled", x=column + min_x, y=y, grains=grains)
+        if index == start:
             break
         #debug_grid(grid)
 
-    # For part one draw the path that all future sand will take (just for fun!)
-    if part == 1:
-        move_sand(grid, start_x, 0, trace=True)
+    # For part one draw the path that all future sand will take (just for fun!), when the
+    # grid is going to be displayed.
+    if part == 1 and options.debug:
+        move_sand(grid, start, trace=True)
     # Display the final grid configuration.
     debug_grid(grid)
     # Count the grains of sand that fell, and report the solution.
-    print(grains)
+    return grains
+
+# ----------------------------------------------------------------------------------------
+# Sparse engine
+# ----------------------------------------------------------------------------------------
+def sparse_plane(stats):
+    """
+    Return the plane for packing the points of the sparse engine.
+
+    It covers the rock, the sand (which spreads no more than max_y + 2 columns either side
+    of the source), and a column either side of both, so no move wraps around a row.
+    """
+    reach = stats["max_y"] + 2
+    min_x = min(stats["min_x"], 500 - reach) - 1
+    max_x = max(stats["max_x"], 500 + reach) + 1
+    return Plane(min_x, min(stats["min_y"], 0), max_x - min_x + 1)
+
+def fill_sparse(plane, blocked, max_y, part):
+    """
+    Fill the space around the blocked points with sand and return the number of grains.
+
+    As in the dense engine, the path of the last grain is kept as a stack, so that each
+    grain starts from the cell above where the one before it settled.  The points are
+    packed into plane, and the blocked set is updated with the grains of sand.
+    """
+    (down, down_left, down_right) = plane.offsets(((0, 1), (-1, 1), (1, 1)))
+    # Grains below the lowest rock are packed at or above bottom.
+    bottom = plane.row_start(max_y + 1)
+    path = [plane.pack(500, 0)]
+    grains = 0
+    while path:
+        point = path[-1]
+        if point >= bottom:
+            # In part one, a grain below the lowest rock falls into the void.  In part
+            # two, it comes to rest on the floor.
+            if part == 1:
+                break
+        elif point + down not in blocked:
+            path.append(point + down)
+            continue
+        elif point + down_left not in blocked:
+            path.append(point + down_left)
+            continue
+        elif point + down_right not in blocked:
+            path.append(point + down_right)
+            continue
+        # The grain came to rest here.
+        path.pop()
+        blocked.add(point)
+        grains += 1
+        if trace.tracer:
+            (x, y) = plane.unpack(point)
+            trace.emit("sand_settled", x=x, y=y, grains=grains)
+    # Every step pushed a point on the path, and every grain popped one, apart from the
+    # source the first grain started from.
+    ops["sand_steps"] += grains + len(path) - 1
+    return grains
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        max_y, paths = read_input(data)
+    with phase("stats"):
+        stats = input_stats(max_y, paths)
+        engine = select(ENGINES, stats, choose_engine)
+    with phase("build"):
+        if engine == "sparse":
+            plane = sparse_plane(stats)
+            return (engine, (plane, max_y, set(plane.pack_all(rock_points(paths)))))
+        return (engine, make_grid(max_y, paths))
+
+def solve_prepared(part, state):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    (engine, grid) = state
+    if engine == "sparse":
+        (plane, max_y, rocks) = grid
+        with phase("build"):
+            blocked = set(rocks)
+        with phase("solve"):
+            return fill_sparse(plane, blocked, max_y, part)
+    with phase("build"):
+        # The sand fills the grid, so each part starts from a fresh copy.  If we're in
+        # part two, add a floor beneath the grid.  It doesn't need to extend to inifinity
+        # in each direction, only the width of the grid because we've made the grid wide
+        # enough to catch all grains.
+        if part == 2:
+            grid = grid.copy(grid.height + 1, fill=ROCK)
+        else:
+            grid = grid.copy()
+    with phase("solve"):
+        return fill_with_sand(grid, part, resume=engine != "drop")
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    max_y, lines = read_input()
-    grid = make_grid(max_y, lines, options.part)
-    fill_with_sand(grid, options.part)
+    main(solve)
 
 # Part one solution for test-input1 is: 24
-# Part two solution for test-input2 is: 93
+# Part two solution for test-input1 is: 93
 # Part one solution for input is: 763
 # Part two solution for input is: 23921
 
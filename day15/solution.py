@@ -2,34 +2,40 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day 15."""
 
+import os
 import sys
-from optparse import OptionParser
+from functools import partial
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.engines import select
+from aoc.extract import each_record, integer_records
+from aoc.infra import debugf, main
+from aoc.instrument import ops, phase
+from aoc.intervals import IntervalSet
 
 # ========================================================================================
 # Solution
 # ========================================================================================
 
+# The engines for checking candidate locations for the distress beacon: against every
+# sensor in turn, or against the sensors near the candidate in a spatial index.
+ENGINES = ("scan", "index")
+REFERENCE_ENGINE = "scan"
+# The fewest sensors that the index engine is used for.
+INDEX_SENSORS = 16
+# The most buckets per sensor (counting a sensor once for each bucket it's in) that the
+# index may have.  Sensors of very different sizes would need more with buckets sized to a
+# typical sensor, so the buckets are made larger, and the index engine isn't chosen.
+INDEX_ENTRIES = 16
+
 # ----------------------------------------------------------------------------------------
 # Part One
 # ----------------------------------------------------------------------------------------
@@ -39,51 +45,37 @@ def part1(sensors):
         linenum = 10
     else:
         linenum = 2000000
-    blocked_ranges = evaluate_line(sensors, linenum)
-    print(count_blocked(blocked_ranges)-1)
+    blocked = evaluate_line(sensors, linenum)
+    # The cells containing beacons on the line aren't cells where a beacon can't be.
+    beacons = set(bx for (sx, sy, bx, by) in sensors if by == linenum and bx in blocked)
+    debugf("Blocked %d cells, %d of which contain beacons", len(blocked), len(beacons))
+    return len(blocked) - len(beacons)
 
 def evaluate_line(sensors, lnum):
-    "Calculate the ranges of cells blocked by each sensor on a given line."
-    blocked_ranges = []
+    "Return the set of cells blocked by the sensors on a given line."
+    blocked = IntervalSet()
     for sensor in sensors:
         (sx, sy, bx, by) = sensor
         distance_to_beacon = abs(sx-bx) + abs(sy-by)
-        debug("Sensor at x=%d, y=%d: closest beacon is at x=%d, y=%d, distance=%d" % (
-            sx, sy, bx, by, distance_to_beacon))
+        debugf("Sensor at x=%d, y=%d: closest beacon is at x=%d, y=%d, distance=%d",
+               sx, sy, bx, by, distance_to_beacon)
         vertical_distance = abs(lnum-sy)
-        debug("  Vertical distance to line %d is %d" % (lnum, vertical_distance))
+        debugf("  Vertical distance to line %d is %d", lnum, vertical_distance)
         width_on_line = distance_to_beacon - vertical_distance
-        debug("  Horizontal width on line %d is %d" % (lnum, width_on_line))
+        debugf("  Horizontal width on line %d is %d", lnum, width_on_line)
         if width_on_line > 0:
             minx = sx - width_on_line
             maxx = sx + width_on_line
-            debug("  Beacon at (%d, %d) blocks range (%d, %d) to (%d, %d)!" % (
-                sx, sy, lnum, minx, lnum, maxx))
-            blocked_ranges.append((minx, maxx))
-    debug("Blocked column ranges for line=%d are: %s" % (lnum, blocked_ranges))
-    return blocked_ranges
-
-def count_blocked(blocked_ranges):
-    "Count the number of blocked cells in the given list of ranges."
-    count = 0
-    pmax = None
-    for blocked in sorted(blocked_ranges, key=lambda x: x[0]):
-        (minx, maxx) = blocked
-        if pmax is None:
-            count = (maxx - minx) + 1
-            debug("Range (%d, %d) blocked %d cells" % (minx, maxx, count))
-            pmax = maxx
-        elif minx <= pmax + 1 and maxx >= pmax + 1:
-            count += (maxx - pmax)
-            debug("Range (%d, %d) blocked %d additional cells, total=%d" % (
-                minx, maxx, maxx - pmax, count))
-            pmax = maxx
-    return count
+            debugf("  Beacon at (%d, %d) blocks range (%d, %d) to (%d, %d)!",
+                   sx, sy, lnum, minx, lnum, maxx)
+            blocked.add(minx, maxx)
+    debugf("Blocked column ranges for line=%d are: %s", lnum, blocked)
+    return blocked
 
 # ----------------------------------------------------------------------------------------
 # Part Two
 # ----------------------------------------------------------------------------------------
-def part2(sensors):
+def part2(sensors, engine):
     """
     Solve part two, find the one location where the disress beacon can be located.
 
@@ -107,19 +99,22 @@ def part2(sensors):
         limit = 20
     else:
         limit = 4000000
+    if engine == "index":
+        check = SensorIndex(sensors).clear
+    else:
+        check = partial(consider_candidate, sensors)
     # Visit each sensor to evaluate all candidate locations for the distress beacon on the
     # border of the blocked region for this sensor.
     for sensor1 in sensors:
         (sx, sy, bx, by) = sensor1
         distance = abs(sx-bx) + abs(sy-by)
-        debug("Sensor at x=%d, y=%d: closest beacon is at x=%d, y=%d, distance=%d" % (
-            sx, sy, bx, by, distance))
+        debugf("Sensor at x=%d, y=%d: closest beacon is at x=%d, y=%d, distance=%d",
+               sx, sy, bx, by, distance)
         # Check candidate positions on the upper edge of the excluded area.
-        (cx, cy) = consider_candidates(sensors, sx, sy, distance+1, limit)
+        (cx, cy) = consider_candidates(check, sx, sy, distance+1, limit)
         # If the proposed solution was no explicitly rejected, this is our solution!
         if cx != -1:
-            print(cx * 4000000 + cy)
-            break
+            return cx * 4000000 + cy
 
 def consider_candidate(sensors, x, y):
     """
@@ -131,75 +126,177 @@ def consider_candidate(sensors, x, y):
         (sx, sy, bx, by) = sensor
         sensor_to_beacon = abs(sx-bx) + abs(sy-by)
         candidate_to_sensor = abs(sx-x) + abs(sy-y)
-        debug("      Considering sensor at (%d, %d) beacon=(%d, %d)" % (sx, sy, bx, by))
+        debugf("      Considering sensor at (%d, %d) beacon=(%d, %d)", sx, sy, bx, by)
         if candidate_to_sensor <= sensor_to_beacon:
-            debug("      Candidate (%d, %d) is too close to sensor (%d, %d), distance=%d" % (
-                x, y, sx, sy, candidate_to_sensor))
+            debugf("      Candidate (%d, %d) is too close to sensor (%d, %d), "
+                   "distance=%d", x, y, sx, sy, candidate_to_sensor)
             return False
-    debug("    No beacon was closer to (%d, %d)!" % (x, y))
+    debugf("    No beacon was closer to (%d, %d)!", x, y)
     return True
 
-def consider_sweep(sensors, x, y, d, limit, xdir, ydir):
-    "Consider candidates on one diagonal sweep on the border the sensor's blocked area."
+def consider_sweep(check, x, y, d, limit, xdir, ydir):
+    """
+    Consider candidates on one diagonal sweep on the border the sensor's blocked area.
+
+    Check is called with the location of each candidate, and returns True if it's correct.
+    """
+    tested = 0
     for v in range(0, d + 1):
         cx = x + (v * xdir)
         cy = y + (d - (v * ydir))
         if cx > limit or cy > limit or cx < 0 or cy < 0:
             continue
-        debug("    Candidate location is: (%d, %d)" % (cx, cy))
-        if consider_candidate(sensors, cx, cy):
+        debugf("    Candidate location is: (%d, %d)", cx, cy)
+        tested += 1
+        if check(cx, cy):
+            ops["candidates_tested"] += tested
             return (cx, cy)
+    ops["candidates_tested"] += tested
     return (-1, -1)
 
-def consider_candidates(sensors, x, y, d, limit):
+def consider_candidates(check, x, y, d, limit):
     "Consider the locations on the bounary of a blocked area for a given sensor."
-    debug("  Considering candidates for sensor (%d, %d) distance=%d" % (x, y, d))
+    debugf("  Considering candidates for sensor (%d, %d) distance=%d", x, y, d)
     # Lower right
-    (cx, cy) = consider_sweep(sensors, x, y, d, limit, 1, 1)
+    (cx, cy) = consider_sweep(check, x, y, d, limit, 1, 1)
     if cx != -1:
         return (cx, cy)
     # Lower left
-    (cx, cy) = consider_sweep(sensors, x, y, d, limit, -1, 1)
+    (cx, cy) = consider_sweep(check, x, y, d, limit, -1, 1)
     if cx != -1:
         return (cx, cy)
     # Upper right
-    (cx, cy) = consider_sweep(sensors, x, y, d, limit, 1, -1)
+    (cx, cy) = consider_sweep(check, x, y, d, limit, 1, -1)
     if cx != -1:
         return (cx, cy)
     # Upper left
-    (cx, cy) = consider_sweep(sensors, x, y, d, limit, -1, -1)
+    (cx, cy) = consider_sweep(check, x, y, d, limit, -1, -1)
     if cx != -1:
         return (cx, cy)
     # No candidate locations bordering this sensor were valid.
     return (-1, -1)
 
+class SensorIndex(object):
+    """
+    The areas blocked by the sensors, bucketed by location.
+
+    In the rotated coordinates u = x + y and v = x - y, the area blocked by a sensor is a
+    square, so the squares are bucketed into a grid of buckets.  A candidate only needs to
+    be checked against the sensors in its own bucket, and the sensors that block the whole
+    of a bucket are checked first, since they reject every candidate in it.
+    """
+
+    def __init__(self, sensors):
+        # The center and half the side of each sensor's square.
+        squares = [(sx + sy, sx - sy, abs(sx-bx) + abs(sy-by))
+                   for (sx, sy, bx, by) in sensors]
+        self.size = size = bucket_size([r for (u, v, r) in squares])[0]
+        self.buckets = {}
+        for square in squares:
+            (u, v, r) = square
+            for bu in range((u - r) // size, (u + r) // size + 1):
+                for bv in range((v - r) // size, (v + r) // size + 1):
+                    self.buckets.setdefault((bu, bv), []).append(square)
+        for ((bu, bv), bucket) in self.buckets.items():
+            (lo_u, lo_v) = (bu * size, bv * size)
+            (hi_u, hi_v) = (lo_u + size - 1, lo_v + size - 1)
+            bucket.sort(key=lambda square: not (
+                square[0] - square[2] <= lo_u and hi_u <= square[0] + square[2]
+                and square[1] - square[2] <= lo_v and hi_v <= square[1] + square[2]))
+
+    def clear(self, x, y):
+        "Return True if no sensor is at least as close to (x, y) as its beacon."
+        u = x + y
+        v = x - y
+        for (su, sv, r) in self.buckets.get((u // self.size, v // self.size), ()):
+            if abs(u - su) <= r and abs(v - sv) <= r:
+                return False
+        return True
+
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
-def read_input():
+def read_input(data):
     "Read the challenge input, and return a list of sensors."
-    sensors = []
-    for line in sys.stdin:
-        line = line.rstrip()
-        line = line.replace("Sensor at x=", "")
-        line = line.replace(": closest beacon is at x=", ", ")
-        line = line.replace("y=", "")
-        (sx, sy, bx, by) = line.split(",")
-        sx = int(sx)
-        sy = int(sy)
-        bx = int(bx)
-        by = int(by)
-        sensors.append((sx, sy, bx, by))
-    return sensors
+    # Each line is the x and y of a sensor, and then of its closest beacon.
+    return list(each_record(integer_records(data, 4), 4))
+
+def index_entries(radii, size):
+    "Return the most bucket entries that squares with the radii have in size buckets."
+    # A square of side 2r + 1 spans at most (2r) // size + 2 buckets each way.
+    return sum(((2 * r) // size + 2) ** 2 for r in radii)
+
+def bucket_size(radii):
+    """
+    Return the size of the index's buckets for sensors with the given radii, and whether
+    the size had to be increased to bound the index.
+
+    The buckets are about as large as a typical square, unless that would put more than
+    INDEX_ENTRIES entries per sensor in the index, in which case they're doubled in size
+    until it doesn't.
+    """
+    radii = sorted(radii) or [0]
+    size = max(1, 2 * radii[len(radii) // 2])
+    limit = INDEX_ENTRIES * len(radii)
+    bounded = False
+    while index_entries(radii, size) > limit:
+        size *= 2
+        bounded = True
+    return (size, bounded)
+
+def input_stats(sensors):
+    """
+    Return the number of sensors, their extent, the spread of their distances to their
+    beacons, and the size of the index's buckets.
+    """
+    xs = [sx for (sx, sy, bx, by) in sensors] or [0]
+    ys = [sy for (sx, sy, bx, by) in sensors] or [0]
+    radii = sorted(abs(sx-bx) + abs(sy-by) for (sx, sy, bx, by) in sensors) or [0]
+    (size, bounded) = bucket_size(radii)
+    return {"sensors": len(sensors), "min_x": min(xs), "max_x": max(xs),
+            "min_y": min(ys), "max_y": max(ys), "min_radius": radii[0],
+            "median_radius": radii[len(radii) // 2], "max_radius": radii[-1],
+            "bucket_size": size, "bucket_size_bounded": bounded}
+
+def choose_engine(stats):
+    """
+    Use the index once there are enough sensors to pay for building it, unless their
+    sizes are so spread out that its buckets had to be enlarged to bound it.
+    """
+    if stats["bucket_size_bounded"]:
+        return "scan"
+    return "index" if stats["sensors"] >= INDEX_SENSORS else "scan"
+
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        sensors = read_input(data)
+    with phase("stats"):
+        return (sensors, select(ENGINES, input_stats(sensors), choose_engine))
+
+def solve_prepared(part, state):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    (sensors, engine) = state
+    with phase("solve"):
+        if part == 1:
+            return part1(sensors)
+        else:
+            return part2(sensors, engine)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
 
 if __name__ == '__main__':
-    sensors = read_input()
-    if options.part == 1:
-        part1(sensors)    else:
-        part2(sensors)
+    main(solve)
 
 # Part one solution for test-input1 is: 26
-# Part two solution for test-input2 is: 56000011
+# Part two solution for test-input1 is: 56000011
 # Part one solution for input is: 5142231
 # Part two solution for input is: 10884459367718
 
@@ -2,29 +2,20 @@
 # -*- coding: utf-8 -*-
 """Advent of Code Day X."""
 
+import os
 import sys
-from optparse import OptionParser
 
 # ========================================================================================
 # Advent of code infrastructure
 # ========================================================================================
 
-parser = OptionParser()
-parser.add_option("-d", "--debug", action="store_true",
-                  help="Emit additional debugging messages.")
-parser.add_option("-p", "--part", action="store", type="int",
-                  help="Choose which part to solve.")
+# Make the shared aoc package importable when run as dayNN/solution.py.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
 
-(options, args) = parser.parse_args()
-if len(args) > 0:
-    parser.error("no arguments are allowed")
-
-if options.part not in [1, 2]:
-    parser.error("please specify --part=1 or --part=2")
-
-def debug(*args, **kwargs):
-    if options.debug:
-        print(*args, **kwargs)
+from aoc.infra import lines, main
+from aoc.instrument import phase
 
 # ========================================================================================
 # Solution
@@ -33,29 +24,46 @@ def debug(*args, **kwargs):
 # ----------------------------------------------------------------------------------------
 # Part One
 # ----------------------------------------------------------------------------------------
-def part1():
+def part1(data):
     pass
 
 # ----------------------------------------------------------------------------------------
 # Part Two
 # ----------------------------------------------------------------------------------------
-def part2():
+def part2(data):
     pass
 
 # ----------------------------------------------------------------------------------------
 # Shared
 # ----------------------------------------------------------------------------------------
-def read_input():
-    for line in sys.stdin:
-        line = line.rstrip()
+def read_input(data):
+    for line in lines(data):
         pass
 
-if __name__ == '__main__':
+# ----------------------------------------------------------------------------------------
+def prepare(data):
+    "Parse the challenge input into the state shared by both parts."
+    with phase("parse"):
+        return read_input(data)
 
-    if options.part == 1:
-        pass
-    else:
-        pass
+def solve_prepared(part, state):
+    "Solve the given part of the challenge from the prepared state and return the answer."
+    with phase("solve"):
+        if part == 1:
+            return part1(state)
+        else:
+            return part2(state)
+
+# ----------------------------------------------------------------------------------------
+def solve(part, data):
+    "Solve part 1, 2 or 'both' of the challenge for the input data and return the answer."
+    state = prepare(data)
+    if part == "both":
+        return (solve_prepared(1, state), solve_prepared(2, state))
+    return solve_prepared(part, state)
+
+if __name__ == '__main__':
+    main(solve)
 
 # Part one solution for test-input1 is:
 # Part two solution for test-input2 is:
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of aoc.coords.
+
+Run from the top of the repository with "python3 -m pytest tests" or
+"python3 -m unittest discover tests".
+"""
+
+import unittest
+
+from aoc.coords import Plane
+
+# ----------------------------------------------------------------------------------------
+class TestPacking(unittest.TestCase):
+    "Points in the plane's box pack to distinct integers from zero, and unpack again."
+
+    def setUp(self):
+        self.plane = Plane(-3, -2, 7)
+
+    def test_round_trip(self):
+        keys = set()
+        for y in range(-2, 4):
+            for x in range(-3, 4):
+                key = self.plane.pack(x, y)
+                self.assertEqual(self.plane.unpack(key), (x, y))
+                keys.add(key)
+        self.assertEqual(keys, set(range(7 * 6)))
+
+    def test_corners(self):
+        self.assertEqual(self.plane.pack(-3, -2), 0)
+        self.assertEqual(self.plane.pack(3, -2), 6)
+        self.assertEqual(self.plane.pack(-3, -1), 7)
+
+    def test_offset(self):
+        key = self.plane.pack(0, 0)
+        for (dx, dy) in ((1, 0), (-1, 0), (0, 1), (0, -1), (2, -2), (-3, 3)):
+            self.assertEqual(self.plane.unpack(key + self.plane.offset(dx, dy)),
+                             (dx, dy))
+        self.assertEqual(self.plane.offsets([(1, 0), (0, 1)]), (1, 7))
+
+    def test_row_start(self):
+        self.assertEqual(self.plane.row_start(-2), 0)
+        self.assertEqual(self.plane.row_start(1), self.plane.pack(-3, 1))
+        self.assertLess(self.plane.pack(3, 0), self.plane.row_start(1))
+
+    def test_pack_all(self):
+        points = [(-3, -2), (0, 0), (3, 3)]
+        packed = self.plane.pack_all(points)
+        self.assertEqual(packed.typecode, 'q')
+        self.assertEqual(list(packed), [self.plane.pack(x, y) for (x, y) in points])
+
+if __name__ == '__main__':
+    unittest.main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
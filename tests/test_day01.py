@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of day 01's heap of the largest sums, and of following an input as it grows.
+
+Run from the top of the repository with "python3 -m pytest tests" or
+"python3 -m unittest discover tests".
+"""
+
+import unittest
+
+from aoc.days import input_path, load
+
+day01 = load(1)
+
+# ----------------------------------------------------------------------------------------
+class TestTopK(unittest.TestCase):
+    "Only the k largest values are kept."
+
+    def test_add(self):
+        top = day01.TopK(2)
+        self.assertTrue(top.add(5))
+        self.assertTrue(top.add(1))
+        self.assertTrue(top.add(3))
+        self.assertFalse(top.add(2))
+        self.assertFalse(top.add(3))
+        self.assertEqual(top.largest(), [5, 3])
+
+    def test_update(self):
+        top = day01.TopK(3)
+        top.update([4, 9, 1, 7, 9, 2])
+        self.assertEqual(top.largest(), [9, 9, 7])
+
+    def test_fewer(self):
+        top = day01.TopK(3)
+        top.update([4])
+        self.assertEqual(top.largest(), [4])
+
+# ----------------------------------------------------------------------------------------
+class TestFollower(unittest.TestCase):
+    "Feeding an input in any pieces gives the answers of solving it so far."
+
+    def setUp(self):
+        with open(input_path(1, 'test-input1'), 'rb') as fh:
+            self.data = fh.read()
+
+    def test_whole(self):
+        follower = day01.Follower(3)
+        follower.feed(self.data)
+        self.assertEqual(follower.answer("both"), day01.solve("both", self.data))
+        self.assertEqual(follower.answer("both"), (24000, 45000))
+
+    def check_pieces(self, data, cuts):
+        "Feed data in pieces ending at each of cuts, checking the answers after each."
+        follower = day01.Follower(3)
+        start = 0
+        for end in list(cuts) + [len(data)]:
+            follower.feed(data[start:end])
+            start = end
+            # Only the lines whose newline has arrived are counted.
+            complete = data[:data.rfind(b'\n', 0, end) + 1]
+            self.assertEqual(follower.answer("both"), day01.solve("both", complete),
+                             (cuts, end))
+
+    def test_split(self):
+        # Split in two at every position, including inside each blank line.
+        for data in (self.data, self.data.replace(b'\n', b'\r\n')):
+            for cut in range(len(data) + 1):
+                self.check_pieces(data, [cut])
+
+    def test_separators(self):
+        # Split through the middle of every blank line, as \n|\n or \r\n|\r\n.
+        for separator in (b'\n\n', b'\r\n\r\n'):
+            data = self.data.replace(b'\n', separator[:len(separator) // 2])
+            cuts = []
+            found = data.find(separator)
+            while found >= 0:
+                cuts.append(found + len(separator) // 2)
+                found = data.find(separator, found + 1)
+            self.assertTrue(cuts)
+            self.check_pieces(data, cuts)
+
+    def test_bytes(self):
+        data = self.data.replace(b'\n', b'\r\n')
+        self.check_pieces(data, range(1, len(data)))
+
+    def test_unterminated(self):
+        # The last line isn't counted until its newline arrives, unlike in solve().
+        follower = day01.Follower(3)
+        follower.feed(b"100\n200")
+        self.assertEqual(follower.answer(1), 100)
+        self.assertEqual(day01.solve(1, b"100\n200"), 300)
+        follower.feed(b"\n")
+        self.assertEqual(follower.answer(1), 300)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
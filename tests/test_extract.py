@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of aoc.extract.
+
+Run from the top of the repository with "python3 -m pytest tests" or
+"python3 -m unittest discover tests".
+"""
+
+import unittest
+
+from aoc.extract import each_record, integer_lines, integer_records, integers
+
+# ----------------------------------------------------------------------------------------
+class TestIntegers(unittest.TestCase):
+    "Every integer is found, whatever text surrounds it."
+
+    def test_signed(self):
+        data = b"Sensor at x=2, y=-18: closest beacon is at x=-2, y=15\n"
+        self.assertEqual(list(integers(data)), [2, -18, -2, 15])
+
+    def test_unsigned(self):
+        self.assertEqual(list(integers(b"x=-2, y=15", signed=False)), [2, 15])
+
+    def test_hyphens(self):
+        # A minus sign after a digit is a hyphen, and one before a space an arrow.
+        self.assertEqual(list(integers(b"2-4,6-8\n")), [2, 4, 6, 8])
+        self.assertEqual(list(integers(b"0,1 -> 3,-1\n")), [0, 1, 3, -1])
+
+    def test_buffers(self):
+        for data in ("move 1 from 2 to 3", memoryview(b"move 1 from 2 to 3")):
+            self.assertEqual(list(integers(data)), [1, 2, 3])
+
+    def test_none(self):
+        self.assertEqual(list(integers(b"noop\n")), [])
+
+# ----------------------------------------------------------------------------------------
+class TestLines(unittest.TestCase):
+    "Integers are kept line by line, and lines without any are kept empty."
+
+    def test_lines(self):
+        data = b"addx 3\nnoop\naddx -5\n"
+        self.assertEqual([list(line) for line in integer_lines(data)], [[3], [], [-5]])
+
+    def test_hyphens(self):
+        data = b"2-4,6-8\r\n1-1,-3--2\r\n"
+        self.assertEqual([list(line) for line in integer_lines(data)],
+                         [[2, 4, 6, 8], [1, 1, -3, -2]])
+
+# ----------------------------------------------------------------------------------------
+class TestRecords(unittest.TestCase):
+    "Integers are grouped into records of a fixed width."
+
+    def test_records(self):
+        flat = integer_records(b"1,2 -> 3,4\n5,6 -> 7,8\n", 4)
+        self.assertEqual(list(each_record(flat, 4)), [(1, 2, 3, 4), (5, 6, 7, 8)])
+
+    def test_wrong_width(self):
+        with self.assertRaises(ValueError):
+            integer_records(b"1 2 3 4 5", 2)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
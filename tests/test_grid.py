@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of aoc.grid.
+
+Run from the top of the repository with "python3 -m pytest tests" or
+"python3 -m unittest discover tests".
+"""
+
+import unittest
+
+from aoc.grid import Grid
+
+# ----------------------------------------------------------------------------------------
+class TestIndexes(unittest.TestCase):
+    "Cells are addressed by (row, column) or by index, and the two agree."
+
+    def test_round_trip(self):
+        for border in (None, ord('#')):
+            grid = Grid(4, 3, border=border)
+            for row in range(3):
+                for column in range(4):
+                    index = grid.index(row, column)
+                    self.assertEqual(grid.position(index), (row, column))
+
+    def test_indexes(self):
+        grid = Grid(3, 2, border=ord('#'))
+        self.assertEqual([grid.position(index) for index in grid.indexes()],
+                         [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)])
+
+    def test_neighbors(self):
+        grid = Grid(3, 3)
+        middle = grid.index(1, 1)
+        self.assertEqual([grid.position(index) for index in grid.neighbors(middle)],
+                         [(0, 1), (1, 2), (2, 1), (1, 0)])
+
+    def test_get_and_set(self):
+        grid = Grid(3, 2, border=ord('#'))
+        grid[1, 2] = ord('x')
+        self.assertEqual(grid[1, 2], ord('x'))
+        self.assertEqual(grid.cells[grid.index(1, 2)], ord('x'))
+        self.assertEqual(grid.find(ord('x')), grid.index(1, 2))
+        self.assertEqual(grid.find(ord('y')), -1)
+
+# ----------------------------------------------------------------------------------------
+class TestBorder(unittest.TestCase):
+    "A border surrounds the grid, one cell beyond each edge."
+
+    def test_border(self):
+        grid = Grid(3, 2, border=ord('#'))
+        self.assertEqual(grid.stride, 5)
+        self.assertEqual(len(grid.cells), 5 * 4)
+        for row in (-1, 2):
+            for column in range(-1, 4):
+                self.assertEqual(grid[row, column], ord('#'))
+        for row in range(2):
+            self.assertEqual(grid[row, -1], ord('#'))
+            self.assertEqual(grid[row, 3], ord('#'))
+        self.assertEqual(grid.render(), "...\n...")
+
+    def test_walk_off(self):
+        # Stepping off any edge lands on the border.
+        grid = Grid(2, 2, border=0)
+        for index in grid.indexes():
+            for neighbor in grid.neighbors(index):
+                self.assertIn(grid.cells[neighbor], (0, ord('.')))
+
+# ----------------------------------------------------------------------------------------
+class TestRows(unittest.TestCase):
+    "Grids are made from rows of bytes and copied."
+
+    def setUp(self):
+        self.grid = Grid.from_rows([b'abc', memoryview(b'def')], border=ord('#'))
+
+    def test_from_rows(self):
+        self.assertEqual((self.grid.width, self.grid.height), (3, 2))
+        self.assertEqual(self.grid.render(), "abc\ndef")
+        self.assertEqual(bytes(self.grid.row(1)), b'def')
+        self.assertEqual(self.grid.column(2), b'cf')
+
+    def test_empty(self):
+        grid = Grid.from_rows([])
+        self.assertEqual((grid.width, grid.height), (0, 0))
+        self.assertEqual(grid.render(), "")
+
+    def test_copy(self):
+        copy = self.grid.copy()
+        copy[0, 0] = ord('z')
+        self.assertEqual(copy.render(), "zbc\ndef")
+        self.assertEqual(self.grid.render(), "abc\ndef")
+
+    def test_copy_height(self):
+        taller = self.grid.copy(height=3, fill=ord('~'))
+        self.assertEqual(taller.render(), "abc\ndef\n~~~")
+        self.assertEqual(taller[3, 0], ord('#'))
+        shorter = self.grid.copy(height=1)
+        self.assertEqual(shorter.render(), "abc")
+        self.assertEqual(shorter[1, 1], ord('#'))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
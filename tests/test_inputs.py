@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of aoc.inputs.
+
+Run from the top of the repository with "python3 -m pytest tests" or
+"python3 -m unittest discover tests".
+"""
+
+import os
+import tempfile
+import unittest
+
+from aoc.inputs import grid_rows, iter_groups, read, split_groups
+
+# Groups of lines with an extra blank line and no final newline.
+GROUPS = b"1000\n2000\n\n4000\n\n\n5000\n6000\n\n7000\n8000\n9000\n\n10000"
+
+def lines(groups):
+    "Return the lines of each group (extra blank lines can leave newlines around it)."
+    return [group.split() for group in groups]
+
+# ----------------------------------------------------------------------------------------
+class TestGroups(unittest.TestCase):
+    "Groups are split at blank lines, a whole buffer or a chunk at a time."
+
+    expected = [[b"1000", b"2000"], [b"4000"], [b"5000", b"6000"],
+                [b"7000", b"8000", b"9000"], [b"10000"]]
+
+    def test_split_groups(self):
+        self.assertEqual(split_groups(b"1\n2\n\n3\n"), [b"1\n2", b"3\n"])
+        self.assertEqual(split_groups(b"1\r\n2\r\n\r\n3"), [b"1\n2", b"3"])
+        self.assertEqual(lines(split_groups(GROUPS)), self.expected)
+        self.assertEqual(lines(split_groups(GROUPS.replace(b"\n", b"\r\n"))),
+                         self.expected)
+        self.assertEqual(split_groups(b"1\n\n \n\n2\n\n"), [b"1", b"2"])
+        self.assertEqual(split_groups(b""), [])
+
+    def test_iter_groups(self):
+        # Every chunk size splits the same groups, however the chunks fall.
+        for data in (GROUPS, GROUPS.replace(b"\n", b"\r\n")):
+            for chunk_size in range(1, len(data) + 2):
+                self.assertEqual(lines(iter_groups(data, chunk_size)), self.expected,
+                                 chunk_size)
+
+    def test_iter_groups_buffers(self):
+        for data in (GROUPS.decode(), memoryview(GROUPS), bytearray(GROUPS)):
+            self.assertEqual(lines(iter_groups(data, 4)), self.expected)
+
+# ----------------------------------------------------------------------------------------
+class TestGridRows(unittest.TestCase):
+    "Rows of a fixed width are sliced without their line endings."
+
+    def rows(self, data):
+        return [bytes(row) for row in grid_rows(data)]
+
+    def test_rows(self):
+        self.assertEqual(self.rows(b"abc\ndef\n"), [b"abc", b"def"])
+        self.assertEqual(self.rows(b"abc\ndef"), [b"abc", b"def"])
+        self.assertEqual(self.rows(b"abc\r\ndef\r\n"), [b"abc", b"def"])
+        self.assertEqual(self.rows("abc\ndef\n"), [b"abc", b"def"])
+
+    def test_single_row(self):
+        self.assertEqual(self.rows(b"abc"), [b"abc"])
+        self.assertEqual(self.rows(b""), [])
+
+# ----------------------------------------------------------------------------------------
+class TestRead(unittest.TestCase):
+    "A file is read (memory-mapped), even when it's empty."
+
+    def test_read(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "input")
+            for data in (GROUPS, b""):
+                with open(path, 'wb') as fh:
+                    fh.write(data)
+                self.assertEqual(bytes(read(path)), data)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End:
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of aoc.intervals.
+
+Run from the top of the repository with "python3 -m pytest tests" or
+"python3 -m unittest discover tests".
+"""
+
+import unittest
+
+from aoc.intervals import IntervalSet
+
+# ----------------------------------------------------------------------------------------
+class TestMerging(unittest.TestCase):
+    "Adding ranges keeps them sorted, disjoint and merged."
+
+    def test_disjoint(self):
+        intervals = IntervalSet([(10, 12), (1, 3)])
+        self.assertEqual(list(intervals), [(1, 3), (10, 12)])
+        self.assertEqual(len(intervals), 6)
+
+    def test_adjacent(self):
+        intervals = IntervalSet([(1, 3), (4, 6)])
+        self.assertEqual(list(intervals), [(1, 6)])
+        self.assertEqual(len(intervals), 6)
+
+    def test_adjacent_before(self):
+        intervals = IntervalSet([(4, 6), (1, 3)])
+        self.assertEqual(list(intervals), [(1, 6)])
+
+    def test_overlapping(self):
+        intervals = IntervalSet([(1, 5), (3, 8)])
+        self.assertEqual(list(intervals), [(1, 8)])
+        self.assertEqual(len(intervals), 8)
+
+    def test_contained(self):
+        intervals = IntervalSet([(1, 10), (3, 4)])
+        self.assertEqual(list(intervals), [(1, 10)])
+        self.assertEqual(len(intervals), 10)
+
+    def test_bridging(self):
+        # A range that fills the gaps between several ranges merges them all.
+        intervals = IntervalSet([(1, 2), (5, 6), (9, 10), (20, 21)])
+        intervals.add(3, 8)
+        self.assertEqual(list(intervals), [(1, 10), (20, 21)])
+        self.assertEqual(len(intervals), 12)
+
+    def test_single_points(self):
+        intervals = IntervalSet([(5, 5), (7, 7), (6, 6)])
+        self.assertEqual(list(intervals), [(5, 7)])
+
+    def test_negative(self):
+        intervals = IntervalSet([(-4, 17), (26, 37), (18, 20)])
+        self.assertEqual(list(intervals), [(-4, 20), (26, 37)])
+        self.assertEqual(len(intervals), 37)
+
+# ----------------------------------------------------------------------------------------
+class TestEdges(unittest.TestCase):
+    "The ends of the ranges are inclusive."
+
+    def setUp(self):
+        self.intervals = IntervalSet([(-4, 17), (26, 37)])
+
+    def test_contains(self):
+        for value in (-4, 0, 17, 26, 37):
+            self.assertIn(value, self.intervals)
+        for value in (-5, 18, 25, 38):
+            self.assertNotIn(value, self.intervals)
+
+    def test_covers(self):
+        self.assertTrue(self.intervals.covers(-4, 17))
+        self.assertTrue(self.intervals.covers(26, 26))
+        self.assertTrue(self.intervals.covers(37, 37))
+        self.assertFalse(self.intervals.covers(-5, 17))
+        self.assertFalse(self.intervals.covers(-4, 18))
+        self.assertFalse(self.intervals.covers(17, 26))
+
+    def test_overlaps(self):
+        self.assertTrue(self.intervals.overlaps(-10, -4))
+        self.assertTrue(self.intervals.overlaps(17, 25))
+        self.assertTrue(self.intervals.overlaps(18, 26))
+        self.assertTrue(self.intervals.overlaps(37, 40))
+        self.assertFalse(self.intervals.overlaps(-10, -5))
+        self.assertFalse(self.intervals.overlaps(18, 25))
+        self.assertFalse(self.intervals.overlaps(38, 40))
+
+    def test_gaps(self):
+        self.assertEqual(list(self.intervals.gaps(-10, 40)),
+                         [(-10, -5), (18, 25), (38, 40)])
+        self.assertEqual(list(self.intervals.gaps(-4, 37)), [(18, 25)])
+        self.assertEqual(list(self.intervals.gaps(0, 10)), [])
+
+    def test_subset_and_disjoint(self):
+        self.assertTrue(IntervalSet([(0, 17), (30, 37)]).issubset(self.intervals))
+        self.assertFalse(IntervalSet([(0, 18)]).issubset(self.intervals))
+        self.assertTrue(IntervalSet([(18, 25), (38, 40)]).isdisjoint(self.intervals))
+        self.assertFalse(IntervalSet([(18, 26)]).isdisjoint(self.intervals))
+
+# ----------------------------------------------------------------------------------------
+class TestEmpty(unittest.TestCase):
+    "A range whose hi is below its lo is empty, as is a set with no ranges."
+
+    def test_add_empty_range(self):
+        intervals = IntervalSet([(5, 4)])
+        self.assertEqual(list(intervals), [])
+        self.assertEqual(len(intervals), 0)
+
+    def test_empty_range(self):
+        intervals = IntervalSet([(-4, 17), (26, 37)])
+        self.assertFalse(intervals.overlaps(34, 33))
+        self.assertFalse(intervals.overlaps(0, -1))
+        self.assertTrue(intervals.covers(34, 33))
+        self.assertTrue(intervals.covers(20, 19))
+        self.assertEqual(list(intervals.gaps(34, 33)), [])
+
+    def test_empty_set(self):
+        intervals = IntervalSet()
+        self.assertEqual(len(intervals), 0)
+        self.assertNotIn(0, intervals)
+        self.assertFalse(intervals.covers(0, 0))
+        self.assertFalse(intervals.overlaps(-10, 10))
+        self.assertEqual(list(intervals.gaps(1, 3)), [(1, 3)])
+        self.assertTrue(intervals.issubset(IntervalSet([(1, 2)])))
+        self.assertTrue(intervals.isdisjoint(IntervalSet([(1, 2)])))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# Local Variables:
+# mode: python
+# fill-column: 90
+# eval: (flyspell-buffer)
+# eval: (column-number-mode)
+# End: